@@ -0,0 +1,56 @@
+"""
+Compares the sheet parser backends on the checked-in cache files.
+
+    python benchmarks/bench_sheet_parser.py [--repeat 20]
+
+Every backend must return exactly the rows the BeautifulSoup fallback returns;
+the speedup column is relative to that fallback.
+"""
+import argparse
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import sheet_parser  # noqa: E402
+
+CACHE_FILES = ["schedule_cache.html", "talent_cache.html"]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backends = sheet_parser.available_backends()
+    print(f"Backends available: {', '.join(backends)}")
+
+    for filename in CACHE_FILES:
+        with open(os.path.join(SRC_DIR, filename), "r", encoding="utf-8") as f:
+            html_content = f.read()
+
+        baseline, reference = best_of(lambda: list(sheet_parser.iter_rows(html_content, "bs4")), args.repeat)
+        print(f"\n{filename} ({len(html_content) / 1024:.0f} KB, {len(reference)} rows)")
+        print(f"  {'backend':<12}{'best ms':>10}{'speedup':>10}  identical")
+        for name in backends:
+            if name == "bs4":
+                elapsed, rows = baseline, reference
+            else:
+                elapsed, rows = best_of(lambda: list(sheet_parser.iter_rows(html_content, name)), args.repeat)
+            print(f"  {name:<12}{elapsed * 1000:>10.1f}{baseline / elapsed:>9.1f}x  {rows == reference}")
+
+
+if __name__ == "__main__":
+    main()
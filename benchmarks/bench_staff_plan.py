@@ -0,0 +1,110 @@
+"""
+Times the staff plan loader and its queries on the checked-in Mitarbeiterplanung.csv.
+
+    python benchmarks/bench_staff_plan.py [--repeat 5]
+
+Before timing, every week is checked against the wide CSV: a person without an entry on
+the Tuesday must carry their Monday assignment, and no checkbox cell becomes an assignment.
+The weekly utilization shares are checked against a per-person count of the long table.
+"""
+import argparse
+import os
+import sys
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import staff_plan  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def check_weeks(text, plan):
+    """Tuesday == Monday for everyone without a Tuesday entry of their own; returns the weeks checked."""
+    wide = pd.read_csv(StringIO(text), index_col=0, dtype=str).set_index("Unnamed: 0")
+    wide.index = wide.index.str.strip()
+    checked = 0
+    is_header = wide.columns.str.match(staff_plan.HEADER_DATE_PATTERN)
+    for i in range(len(wide.columns) - 1):
+        # Every 7th column of a block is a Monday, also past a missing header
+        if is_header[i]:
+            block_start, block_monday = i, pd.to_datetime(wide.columns[i], format=staff_plan.HEADER_DATE_FORMAT)
+        if not is_header[:i + 1].any() or (i - block_start) % staff_plan.DAYS_PER_WEEK or is_header[i + 1]:
+            continue
+        monday = block_monday + pd.Timedelta(days=i - block_start)
+        tuesday_cells = wide.iloc[:, i + 1].fillna("").str.strip()
+        no_override = set(tuesday_cells.index[tuesday_cells.isin(("",) + staff_plan.CHECKBOX_LABELS)])
+
+        def assignments(day):
+            rows = plan.on_date(day)
+            rows = rows[rows["Staff"].isin(no_override)]
+            return dict(zip(rows["Staff"].astype(str), rows["Assignment"].astype(str)))
+
+        on_monday, on_tuesday = assignments(monday), assignments(monday + pd.Timedelta(days=1))
+        assert on_monday == on_tuesday, f"week of {monday:%d/%m/%y}: Tuesday differs from Monday without an override"
+        checked += 1
+    labels = set(plan.df["Assignment"].astype(str))
+    assert not labels & set(staff_plan.CHECKBOX_LABELS), "checkbox cells parsed as assignments"
+    return checked
+
+
+def check_utilization(plan):
+    """weekly_utilization() against a direct count of every person's rows; returns the mean project share."""
+    weeks, shares = plan.weekly_utilization()
+    total = sum(shares.values())
+    assert (total >= 0).all() and (total <= 1 + 1e-6).all(), "a week is more than fully used"
+    kinds = {staff_plan.KIND_LABELS[kind]: kind for kind in staff_plan.UTILIZATION_KINDS}
+    for s, staff in enumerate(plan.staff):
+        rows = plan.staff_range(staff)
+        dates = pd.DatetimeIndex(rows["Date"])
+        week = weeks.get_indexer(dates.normalize() - pd.to_timedelta(dates.weekday, unit="D"))
+        row_kinds = plan.kinds[rows.index.to_numpy()]
+        for label, kind in kinds.items():
+            expected = np.bincount(week, weights=(row_kinds & kind) != 0, minlength=len(weeks))
+            assert np.allclose(shares[label][s], expected / staff_plan.DAYS_PER_WEEK), f"{staff}: wrong {label} share"
+    return float(shares[staff_plan.KIND_LABELS[staff_plan.PROJECT]].mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(staff_plan.PLAN_CSV, "r", encoding="utf-8") as f:
+        text = f.read()
+    parse_s, long = best_of(lambda: staff_plan.parse_plan_csv(text), args.repeat)
+    build_s, plan = best_of(lambda: staff_plan.StaffPlan(long), args.repeat)
+    weeks = check_weeks(text, plan)
+    print(f"{len(plan.staff)} staff, {len(long)} assigned days, Tuesday == Monday checked on {weeks} weeks")
+    print(f"weekly utilization matches the long table, mean project share {check_utilization(plan):.2f}")
+
+    day = long["Date"].iloc[len(long) // 2]
+    staff = plan.staff[0]
+    timings = [
+        ("parse_plan_csv", parse_s),
+        ("StaffPlan()", build_s),
+        ("staff_range", best_of(lambda: plan.staff_range(staff, day, day + pd.Timedelta(days=90)), args.repeat)[0]),
+        ("on_date", best_of(lambda: plan.on_date(day), args.repeat)[0]),
+        ("occurrences", best_of(lambda: plan.occurrences("day off"), args.repeat)[0]),
+        ("build + weeks", best_of(lambda: staff_plan.StaffPlan(long).weekly_utilization(), args.repeat)[0]),
+    ]
+    print(f"  {'step':<16}{'best ms':>10}")
+    for name, elapsed in timings:
+        print(f"  {name:<16}{elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Times the batch staffing solver on synthetic instances (200 staff x 100 projects by default).
+
+    python benchmarks/bench_staffing_solver.py [--staff 200] [--projects 100] [--weeks 2] [--repeat 5] [--optimality 30]
+
+Every solution is checked against the capacities (nobody booked beyond their free days,
+no project beyond its demand) and compared with a greedy best-fit-first assignment. Before
+timing, solve() is checked for optimality against the LP relaxation on --optimality small
+instances (the constraint matrix is totally unimodular, so the LP optimum is the integer one).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import staffing_solver  # noqa: E402
+from schedule_model import DAYS_PER_WEEK  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def synthetic(n_staff, n_projects, n_days, seed):
+    """Random fit, ~30% free days, project windows of 3-n_days days and 2-20 person-days of demand."""
+    rng = np.random.default_rng(seed)
+    fit = rng.random((n_staff, n_projects)) * (rng.random((n_staff, n_projects)) < 0.6)
+    free = rng.random((n_staff, n_days)) < 0.3
+    length = rng.integers(3, n_days + 1, n_projects)
+    start = rng.integers(0, n_days - length + 1)
+    days = np.arange(n_days)
+    day_masks = (days >= start[:, None]) & (days < (start + length)[:, None])
+    demand = rng.integers(2, 21, n_projects)
+    return fit, free, day_masks, demand
+
+
+def greedy(fit, free, day_masks, demand):
+    """Best (staff, project) pairs first, each taking every shared free day still open."""
+    free, need = free.copy(), demand.copy()
+    days = np.zeros(fit.shape, dtype=np.int64)
+    for flat in np.argsort(-fit, axis=None):
+        s, p = divmod(int(flat), fit.shape[1])
+        if fit[s, p] <= 0:
+            break
+        for d in np.flatnonzero(free[s] & day_masks[p])[:need[p]]:
+            free[s, d] = False
+            need[p] -= 1
+            days[s, p] += 1
+    return days
+
+
+def check(days, free, day_masks, demand):
+    assert (days.sum(axis=1) <= free.sum(axis=1)).all(), "staff booked beyond their free days"
+    assert (days.sum(axis=0) <= demand).all(), "project staffed beyond its demand"
+    assert (days <= free.astype(np.int64) @ day_masks.T).all(), "staff booked outside the project window"
+
+
+def lp_optimum(fit, free, day_masks, demand):
+    """Max total fit of the LP over x[s, d, p] in [0, 1]: one project per free (staff, day), demand per project."""
+    s, d, p = np.nonzero(free[:, :, None] & day_masks.T[None, :, :] & (fit > 0)[:, None, :])
+    if not len(s):
+        return 0.0
+    n_days = free.shape[1]
+    var = np.arange(len(s))
+    cell = s * n_days + d
+    a_ub = coo_matrix((np.ones(2 * len(s)), (np.concatenate([cell, free.size + p]), np.concatenate([var, var]))),
+                      shape=(free.size + len(demand), len(s)))
+    b_ub = np.concatenate([np.ones(free.size), demand])
+    result = linprog(-fit[s, p], A_ub=a_ub.tocsr(), b_ub=b_ub, bounds=(0, 1), method="highs")
+    assert result.status == 0, result.message
+    return -result.fun
+
+
+def check_optimal(n_instances, seed):
+    """solve() against lp_optimum on small random instances; returns the largest gap."""
+    worst = 0.0
+    for i in range(n_instances):
+        fit, free, day_masks, demand = synthetic(30, 15, 2 * DAYS_PER_WEEK, seed + i)
+        days = staffing_solver.solve(fit, free, day_masks, demand)
+        check(days, free, day_masks, demand)
+        gap = lp_optimum(fit, free, day_masks, demand) - (days * fit).sum()
+        assert gap < 1e-6, f"instance {seed + i}: solve() is {gap:.4f} below the optimum"
+        worst = max(worst, gap)
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--weeks", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--optimality", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.optimality:
+        worst = check_optimal(args.optimality, args.seed)
+        print(f"optimal on {args.optimality} small instances (30 staff x 15 projects), largest gap {worst:.2e}")
+
+    fit, free, day_masks, demand = synthetic(args.staff, args.projects, args.weeks * DAYS_PER_WEEK, args.seed)
+    print(f"{args.staff} staff x {args.projects} projects, {free.shape[1]} days: "
+          f"{int(free.sum())} free person-days, {int(demand.sum())} needed")
+
+    solved_s, days = best_of(lambda: staffing_solver.solve(fit, free, day_masks, demand), args.repeat)
+    greedy_s, greedy_days = best_of(lambda: greedy(fit, free, day_masks, demand), 1)
+    check(days, free, day_masks, demand)
+    check(greedy_days, free, day_masks, demand)
+
+    print(f"  {'method':<12}{'best ms':>10}{'total fit':>12}{'staffed days':>14}")
+    for name, elapsed, result in (("hungarian", solved_s, days), ("greedy", greedy_s, greedy_days)):
+        print(f"  {name:<12}{elapsed * 1000:>10.1f}{(result * fit).sum():>12.2f}{int(result.sum()):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import threading
+
+# source name ("schedule", "talent", ...) -> {(file, qualname): cached function}
+_dependents = {}
+# source name -> content hash the cached entries were last computed for
+_current_hashes = {}
+_lock = threading.Lock()
+
+
+def _function_key(fn):
+    # Page scripts all run as __main__, so tell same-named functions apart by their file
+    wrapped = getattr(fn, "__wrapped__", fn)
+    code = getattr(wrapped, "__code__", None)
+    return (code.co_filename if code else "", fn.__qualname__)
+
+
+def depends_on(*sources):
+    """Registers the cached function below (above its @st.cache_* decorator) as derived from `sources`."""
+    def register(fn):
+        with _lock:
+            for source in sources:
+                _dependents.setdefault(source, {})[_function_key(fn)] = fn
+        return fn
+    return register
+
+
+def invalidate(source):
+    """Clears the cached functions derived from `source` only, everything else stays warm."""
+    with _lock:
+        functions = list(_dependents.get(source, {}).values())
+    for fn in functions:
+        fn.clear()
+    return len(functions)
+
+
+def observe(source, content_hash):
+    """Records the hash served for `source`; True (and its dependents cleared) when it changed."""
+    with _lock:
+        previous = _current_hashes.get(source)
+        _current_hashes[source] = content_hash
+    if previous is None or previous == content_hash:
+        return False
+    invalidate(source)
+    return True
+
+
+def current_hash(source):
+    return _current_hashes.get(source)
@@ -1,8 +1,24 @@
+import hashlib
+import re
+from html import escape
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import streamlit as st
 import pandas as pd
 
+import cache_registry
+
+def content_hash(html_content):
+    """
+    Stable fingerprint of a published sheet (sha1 of its text),
+    used as cache key for everything fetched or parsed from it.
+    """
+    return hashlib.sha1(html_content.encode("utf-8")).hexdigest()
+
+def name_key(name):
+    """Staff names are typed slightly differently across sheets ("De Suka" / "Desuka")."""
+    return re.sub(r"\s+", "", str(name)).lower()
+
 def to_human_date(date_str):
     """
     Converts '05.02.16' (DD.MM.YY) to 'February 5th, 2016'
@@ -57,14 +73,8 @@ def count_time_since(date_str):
     except (ValueError, TypeError):
         return ""
     
-# 1. Define the rendering function (Make sure this is outside your main loop)
-def render_project_section(df, title, header_color):
-    if df.empty:
-        st.write(f"No {title.lower()} projects.")
-        return
-
-    # Build the string
-    html = f"""
+# Project table fragments, filled from whole columns at once
+PROJECT_TABLE_HEAD = """
     <table style="width:100%; border-collapse:collapse; color:black; background-color:white; font-family:sans-serif;">
         <tr style="background-color:{header_color}; font-weight:bold; border-bottom:2px solid #ccc;">
             <th style="padding:8px; text-align:left;">Category</th>
@@ -72,16 +82,48 @@ def render_project_section(df, title, header_color):
             <th style="padding:8px; text-align:right;">Time</th>
         </tr>
     """
-    for _, row in df.iterrows():
-        #print(row)
-        html += f"""
+PROJECT_ROW = """
         <tr style="border-bottom:1px solid #eee;">
-            <td style="padding:8px;">{row['Category']}</td>
-            <td style="padding:8px;background-color:{row['File']}">{row['Projekt']}</td>
-            <td style="padding:8px; text-align:right;">{row['Time']}</td>
+            <td style="padding:8px;">{}</td>
+            <td style="padding:8px;background-color:{}">{}</td>
+            <td style="padding:8px; text-align:right;">{}</td>
         </tr>
         """
-    html += "</table>"
-    
+# html.escape(quote=True), as chained vectorized replaces ("&" first)
+HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+def escape_column(col):
+    """HTML-escaped text of a whole column (missing values render as '')."""
+    text = col.astype(object).where(col.notna(), "").astype(str)
+    for char, entity in HTML_ESCAPES:
+        text = text.str.replace(char, entity, regex=False)
+    return text.tolist()
+
+def project_table_html(df, header_color):
+    """<table> of the Category / Projekt / Time columns, File as the project cell background."""
+    rows = zip(*(escape_column(df[col]) for col in ("Category", "File", "Projekt", "Time")))
+    return (PROJECT_TABLE_HEAD.format(header_color=escape(header_color))
+            + "".join(PROJECT_ROW.format(*row) for row in rows)
+            + "</table>")
+
+@cache_registry.depends_on("schedule")
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_project_table_html(cache_key, header_color, _df):
+    return project_table_html(_df, header_color)
+
+def render_project_section(df, title, header_color, cache_key=None):
+    """
+    Renders a project list as an HTML table. With a `cache_key` (e.g. schedule content hash +
+    coordinator) the fragment is built once per key instead of on every rerun.
+    """
+    if df.empty:
+        st.write(f"No {title.lower()} projects.")
+        return
+
+    if cache_key is None:
+        html = project_table_html(df, header_color)
+    else:
+        html = _cached_project_table_html(cache_key, header_color, df)
+
     # THIS LINE IS KEY:
-    st.html(html, unsafe_allow_javascript=False)
\ No newline at end of file
+    st.html(html, unsafe_allow_javascript=False)
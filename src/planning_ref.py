@@ -1,18 +1,17 @@
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import re
 import streamlit as st
 from streamlit_extras.tags import tagger_component
-import os
-import time
 import pathlib
-from datetime import timedelta
 import plotly.express as px
 import plotly.graph_objects as go
-from io import StringIO
 
-from project_tracker import ProjectTracker
+import project_tracker
+from sheet_document import get_sheet_document
+from sheet_refresher import get_refresher
+import cache_registry
+import schedule_model
+import schedule_history
+import talent_matrix
 import helper
 # --- 1. SCRAPER ---
 HTML_FILE = "schedule_cache.html"
@@ -21,6 +20,12 @@ TALENT_HTML = "talent_cache.html"
 URL_SCHEDULE = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQxy9OIle28SzGUOMwz8-jsLv1bWFl5iuZVU5E9DWwy1hUC9ni7HpZORR-Fa0WPaSzyboo229vPv5aN/pubhtml?gid=1836612665&single=true&widget=false&headers=false"
 URL_TALENT = "https://docs.google.com/spreadsheets/u/0/d/e/2PACX-1vTVsigeKQiKTO5GEwF0baT3AGzxQ9NIBHJM8cju5wuBd_W5ttuFNUSxfiXFgceBJ_pFOQ1jWMvPe_Cp/pubhtml/sheet?headers=false&gid=0"
 
+# Every published sheet the dashboard reads: (name, url, cache file)
+SHEET_SOURCES = (
+    ("schedule", URL_SCHEDULE, HTML_FILE),
+    ("talent", URL_TALENT, TALENT_HTML),
+)
+
 
 # This map follows your specific image headers
 TALENT_GROUPS = {
@@ -90,105 +95,59 @@ ROLES = {
         "New App": ["Vektor Work", "Revit"]
     }
 }
-def get_html_content(url, filename, force_refresh=False):
-    file_exists = os.path.exists(filename)
-    # Check if file is older than 1 hour
-    is_old = file_exists and (time.time() - os.path.getmtime(filename) > 3600)
-
-    if not file_exists or is_old or force_refresh:
-        response = requests.get(url)
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(response.text)
-        return response.text
-    
-    with open(filename, "r", encoding="utf-8") as f:
-        return f.read()
-
 # Test
 # print(to_human_date("05.02.16")) # Output: February 5th, 2016
+@cache_registry.depends_on("schedule")
 @st.cache_data(show_spinner="Processing Project list...")  # Cache for 1 hour
-def extract_project_table_simple(html_content, max_employee_idx):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    rows = soup.find_all('tr')
-    
-    start_row_idx = None
-    nr_col_idx = None
+def extract_project_table_simple(html_content):
+    doc = get_sheet_document(html_content)
+    rows = doc.cells
     server_col_idx = None
 
-    # 1. Locate the "Nr." starting point
-    for r_idx in range(max_employee_idx, len(rows)):
-        cells = rows[r_idx].find_all(['td', 'th'])
-        for c_idx, cell in enumerate(cells):
-            if cell.get_text(strip=True) == "Nr.":
-                nr_col_idx = c_idx
-                start_row_idx = r_idx
-                break
-        if start_row_idx: break
-
-    if start_row_idx is None:
+    # 1. Locate the first "Nr." header row straight from the document's token index
+    nr_rows = doc.rows_with("Nr.")
+    if not nr_rows:
         return pd.DataFrame()
+    start_row_idx = nr_rows[0]
+    nr_col_idx = next(c_idx for c_idx, (text, _, _) in enumerate(rows[start_row_idx])
+                      if text.strip().upper() == "NR.")
     # 2. Locate the "Server" column width
-    header_cells = rows[start_row_idx].find_all(['td', 'th'])
+    header_cells = rows[start_row_idx]
     for c_idx in range(nr_col_idx, len(header_cells)):
-        if "Server" in header_cells[c_idx].get_text(strip=True):
+        if "Server" in header_cells[c_idx][0]:
             server_col_idx = c_idx + 1
             break
 
     start_row_idx = start_row_idx - 1
-    # 3. Reconstruct a simple HTML table string for the selected area
-    table_html = "<table>"
+    # 3. Expand the selected area (colspans included) straight from the parsed cells
+    table_rows = []
     for r_idx in range(start_row_idx, len(rows)):
-        cells = rows[r_idx].find_all(['td', 'th'])
+        cells = rows[r_idx]
         if len(cells) > nr_col_idx:
-            # Check if 'Nr.' is empty after the header row to find the end
-            #if r_idx > start_row_idx and not cells[nr_col_idx].get_text(strip=True):
-            #    break
-            
-            # Extract only the columns between Nr. and Server
-            row_html = "".join([str(cells[i]) for i in range(nr_col_idx, server_col_idx + 1)])
-            table_html += f"<tr>{row_html}</tr>"
-    table_html += "</table>"
-
-    # 4. Use StringIO to read with Pandas
-    return pd.read_html(StringIO(table_html))[0]
-
+            row_vals = []
+            for text, _, colspan in cells[nr_col_idx:server_col_idx + 1]:
+                row_vals.extend([text or None] * colspan)
+            table_rows.append(row_vals)
+
+    # 4. Same typed frame pd.read_html used to return, without re-parsing HTML
+    df = pd.DataFrame(table_rows)
+    return df.apply(_to_numeric_or_keep)
+
+def _to_numeric_or_keep(col):
+    try:
+        return pd.to_numeric(col)
+    except (ValueError, TypeError):
+        return col
+
+@cache_registry.depends_on("schedule")
 @st.cache_data(show_spinner="Processing Schedule...")  # Cache for 1 hour
 def get_raw_data_and_colors(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    style_map = {}
-    style_tag = soup.find('style')
-    if style_tag:
-        matches = re.findall(r'\.(s\d+)\{[^}]*background-color:(#[a-fA-F0-9]{3,6})', style_tag.text)
-        style_map = {cls: color for cls, color in matches}
-
-    table = soup.find('table')
-    rows = table.find_all('tr')
-    
-    val_data, color_data = [], []
-
-    for row in rows:
-        v_row, c_row = [], []
-        cells = row.find_all(['td', 'th'])
-        for cell in cells:
-            colspan = int(cell.get('colspan', 1))
-            text = cell.get_text(strip=True)
-            cls = cell.get('class', [None])[0]
-            color = style_map.get(cls, "#FFFFFF")
-            for _ in range(colspan):
-                v_row.append(text)
-                c_row.append(color)
-        if v_row:
-            val_data.append(v_row)
-            color_data.append(c_row)
-
-    return pd.DataFrame(val_data), pd.DataFrame(color_data)
+    doc = get_sheet_document(html_content)
+    return pd.DataFrame(doc.values), pd.DataFrame(doc.color_grid("#FFFFFF"))
 
+@cache_registry.depends_on("talent")
 @st.cache_data(show_spinner="Processing Talent List...")
 def process_talent_with_roles(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    style_tag = soup.find('style')
-    
     # 1. Map CSS classes to Role names
     role_colors = {
         "#da9694": "IT", "#fabf8f": "Head Coordinator",
@@ -197,30 +156,24 @@ def process_talent_with_roles(html_content):
         "#d9d9d9": "Trainee"
     }
     
+    doc = get_sheet_document(html_content)
     color_map = {}
-    if style_tag:
-        import re
-        styles = re.findall(r'\.(s\d+)\{[^}]*background-color:(#[a-fA-F0-9]{6})', style_tag.text)
-        for class_name, hex_val in styles:
-            color_map[class_name] = role_colors.get(hex_val.lower(), "Staff")
-
-    # 2. Extract Data Rows
-    table = soup.find('table')
-    rows = table.find_all('tr')
-    headers = [cell.get_text(strip=True) for cell in rows[14].find_all(['td', 'th'])]
+    for class_name, hex_val in doc.class_map.items():
+        color_map[class_name] = role_colors.get(hex_val.lower(), "Staff")
+
+    # 2. Extract Data Rows (physical (text, class, colspan) cells of the shared parsed document)
+    headers = [text for text, _, _ in doc.cells_at(14)]
     
     raw_data = []
     role_list = []
     
-    for row in rows[15:]:
-        cells = row.find_all(['td', 'th'])
+    for cells in doc.cells[doc.first_grid_row(15):]:
         if len(cells) > 5:
             # Extract Text
-            text_cells = [c.get_text(strip=True) for c in cells]
+            text_cells = [text for text, _, _ in cells]
             
             # Extract Role from Column 3 (Index 2)
-            staff_cell = cells[2]
-            class_attr = staff_cell.get('class', [None])[0]
+            class_attr = cells[2][1]
             role = color_map.get(class_attr, "Staff")
             
             if text_cells[2]: # If Staff name exists
@@ -242,6 +195,7 @@ def process_talent_with_roles(html_content):
     return df_talent
 
 # --- 2. REBUILD (Including Weekends) ---
+@cache_registry.depends_on("talent")
 @st.cache_data(show_spinner="Processing Project list...")  # Cache for 1 hour
 def create_vertical_summary(df_summary, color_discrete_map, highlight_role=None):
     # Calculate midpoints for text placement
@@ -295,149 +249,36 @@ def create_vertical_summary(df_summary, color_discrete_map, highlight_role=None)
     
     return fig_v
 
-def rebuild_schedule(df_v, df_c):
-    # Find Anchor Date
-    date_pattern = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-    start_date = None
-    anchor_col = 0
-
-    for r in range(min(15, len(df_v))):
-        for c in range(min(10, len(df_v.columns))):
-            match = re.search(date_pattern, str(df_v.iloc[r, c]))
-            if match:
-                start_date = pd.to_datetime(match.group(1), dayfirst=True)
-                anchor_col = c 
-                break
-        if start_date: break
-
-    if not start_date:
-        return None, None, "Could not find start date."
-
-    # Generate 14 Days Header
-    work_days = ["Staff"]
-    for i in range(14):
-        day = start_date + timedelta(days=i)
-        work_days.append(day.strftime('%a %d/%m'))
-
-    final_rows, color_rows = [], []
-    
-    # Start at Row 5 (Index 4)
-    for i in range(4, len(df_v)):
-        name = str(df_v.iloc[i, 1]).strip() 
-        
-        if name and name.lower() != "none" and name != "":
-            # --- THE FIX IS HERE ---
-            # Get the color for the name from the same coordinates as the value
-            name_color = df_c.iloc[i, 1] 
-            
-            # Values: [Name] + [14 days of data]
-            row_vals = [name] + df_v.iloc[i, anchor_col : anchor_col + 14].tolist()
-            
-            # Colors: [Name Color] + [14 days of colors]
-            row_cols = [name_color] + df_c.iloc[i, anchor_col : anchor_col + 14].tolist()
-            
-            # Padding to ensure 15 columns
-            while len(row_vals) < 15: row_vals.append("")
-            while len(row_cols) < 15: row_cols.append("#FFFFFF")
-            
-            final_rows.append(row_vals)
-            color_rows.append(row_cols)
+def rebuild_schedule(df_v, df_c, start_date=None, weeks=schedule_model.DEFAULT_WEEKS):
+    # Window of `weeks` weeks from start_date (default: the sheet's anchor date),
+    # sliced from the sheet's date -> column index
+    return schedule_model.build_window(df_v, df_c, start=start_date, weeks=weeks)
 
-    return pd.DataFrame(final_rows, columns=work_days), pd.DataFrame(color_rows, columns=work_days), None
 
+def apply_styles(x, css):
+    # Set text to black and apply background colors, from the per-snapshot CSS matrix
+    return pd.DataFrame(css, index=x.index, columns=x.columns)
 
-def apply_styles(x):
-    # Set text to black and apply background colors
-    style_df = pd.DataFrame('color: black; font-weight: 500;', index=x.index, columns=x.columns)
-    for r in range(len(x)):
-        for c in range(len(x.columns)):
-            bg = st.session_state.colors.iloc[r, c]
-            style_df.iloc[r, c] += f' background-color: {bg};'
-    return style_df
+def apply_color_swatches(col):
+    # Paint a column of hex colors with its own colors
+    return 'background-color: ' + col.astype(str) + ';'
 
-def get_metrics_summary(df_val, df_col):
-    # Adjust this hex code to the exact COLOR used in your sheet for "Day Off"
-    DAY_OFF_COLOR = "#ffff00" 
-    
-    # Week 1: Columns 1-7 | Week 2: Columns 8-14
-    # (Index 0 is the Name column)
-    w1_cols = df_col.iloc[:, 1:8]
-    w2_cols = df_col.iloc[:, 8:15]
-    
-    # Count occurrences of the color per row
-    df_val['W1_Off'] = (w1_cols == DAY_OFF_COLOR).sum(axis=1)
-    df_val['W2_Off'] = (w2_cols == DAY_OFF_COLOR).sum(axis=1)
+def get_metrics_summary(df_val, model):
+    # Day-off cells are pre-classified in the model (color == schedule_model.DAY_OFF_COLOR)
+    # One W<n>_Off column per 7-day block of the window, one reshape for all weeks
+    weekly_off = model.weekly_counts(schedule_model.DAY_OFF)
+    for week in range(weekly_off.shape[1]):
+        df_val[f'W{week + 1}_Off'] = weekly_off[:, week]
     
     # Identify Free Resources (Value 0)
-    # Checks if '0' exists anywhere in the 14 days for that employee
-    free_resources = df_val[df_val.iloc[:, 1:15].astype(str).eq('0').any(axis=1)]['Staff'].tolist()
+    # Checks if '0' exists anywhere in the window for that employee
+    free_resources = model.staff_with(schedule_model.FREE)
     
     return df_val, free_resources
-def get_detailed_metrics(df_val):
-    training_data = []
-    free_data = []
-
-    # Iterate through rows (employees)
-    for _, row in df_val.iterrows():
-        name = row["Staff"]
-        emp_training_days = []
-        emp_free_days = []
-
-        # Iterate through the 14 day columns
-        for col_name in df_val.columns[1:15]:
-            cell_value = str(row[col_name]).strip()
-            
-            # Identify Training
-            if "training" in cell_value.lower():
-                emp_training_days.append(col_name)
-            
-            # Identify Value 0 (Free)
-            if cell_value == "0":
-                emp_free_days.append(col_name)
 
-        if emp_training_days:
-            training_data.append({"name": name, "days": emp_training_days})
-        
-        if emp_free_days:
-            free_data.append({"name": name, "days": emp_free_days})
-
-    return training_data, free_data
-
-def score_skill(value):
-    val = str(value).strip().lower()
-    if val == 'm': return 6
-    if val == 'w': return 7
-    if val.isdigit(): return float(val)
-    return 0
-
-def get_mastery_score(value):
-    val = str(value).strip().upper()
-    mapping = {
-        '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, 
-        '5.1': 6, 'M': 7, 'W': 8
-    }
-    return mapping.get(val, 0)
-
-def create_stacked_skill_chart(staff_name, df_talent, talent_groups):
-    # Get staff row
-    row = df_talent[df_talent.iloc[:, 0] == staff_name].iloc[0]
-    
-    plot_data = []
-    for category, sub_skills in talent_groups.items():
-        for skill in sub_skills:
-            if skill in df_talent.columns:
-                val = row[skill]
-                score = get_mastery_score(val)
-                # Only include skills that have a value
-                if score > 0:
-                    plot_data.append({
-                        "Category": category,
-                        "Sub-Skill": skill,
-                        "Mastery Score": score,
-                        "Label": val
-                    })
-    
-    df_plot = pd.DataFrame(plot_data)
+def create_stacked_skill_chart(staff_name, talent, talent_groups):
+    # Rated skills of the staff member, read from the precomputed TalentMatrix
+    df_plot = talent.group_scores(staff_name, talent_groups)
     
     if df_plot.empty:
         return None
@@ -473,20 +314,13 @@ def create_stacked_skill_chart(staff_name, df_talent, talent_groups):
     
     return st.plotly_chart(fig, width='stretch')
 
-def create_proficiency_heatmap(df_talent):
-    # Force everything to string to ensure '5.1', 'M', and 'W' show up
-    mastery_levels = ['1', '2', '3', '4', '5', '5.1', 'M', 'W']
+def create_proficiency_heatmap(talent):
+    # Staff per (level, skill), counted once per talent snapshot ('5.1', 'M' and 'W' included)
+    mastery_levels = talent_matrix.MASTERY_LEVELS
     
-    skills = [c for c in df_talent.columns if c != "Staff" and  c != "Role"]
+    skills = talent.skills
     
-    agg_data = []
-    for level in mastery_levels:
-        level_counts = []
-        for skill in skills:
-            # Case-insensitive count for M/W and exact match for numbers
-            count = df_talent[skill].astype(str).str.strip().str.upper().eq(level.upper()).sum()
-            level_counts.append(count)
-        agg_data.append(level_counts)
+    agg_data = talent.level_counts.tolist()
 
     # Create Heatmap
     fig = go.Figure(data=go.Heatmap(
@@ -513,21 +347,13 @@ def create_proficiency_heatmap(df_talent):
     
     return fig
 
-def create_specialized_radar(selected_staff, df_talent, role_name, key=None):
+def create_specialized_radar(selected_staff, talent, role_name, key=None):
     """
     key is for streamlit specific
     Creates a radar chart based on specific role groups (IT, C, Z, or Staff).
-    Handles 'W'=8, 'M'=7, and numeric strings like '5.1'.
+    Scores come from the TalentMatrix: 1-5, '5.1'=6, 'M'=7, 'W'=8.
     """
-    # 1. Configuration & Mapping
-    # W is highest (8), M is below W (7)
-    proficiency_map = {
-        'W': 8.0, 'w': 8.0,
-        'M': 7.0, 'm': 7.0,
-        '': 0.0, None: 0.0
-    }
-    
-    # Use the ROLES dictionary we defined previously
+    # 1. Use the ROLES dictionary we defined previously
     # (Ensure the ROLES dict is defined in your script scope)
     target_groups = ROLES.get(role_name, {})
     
@@ -535,39 +361,13 @@ def create_specialized_radar(selected_staff, df_talent, role_name, key=None):
         st.error(f"Role group '{role_name}' not found.")
         return
 
-    # 2. Extract Staff Data
-    staff_data = df_talent[df_talent['Staff'] == selected_staff]
-    if staff_data.empty:
+    # 2. Locate the staff row
+    if talent.staff_index(selected_staff) is None:
         st.warning(f"No data for {selected_staff}")
         return
 
-    categories = []
-    values = []
-
-    # 3. Process each group in the Role
-    for group_name, skills in target_groups.items():
-        valid_skills = [s for s in skills if s in staff_data.columns]
-        
-        if valid_skills:
-            skill_row = staff_data[valid_skills].iloc[0]
-            numeric_vals = []
-            
-            for val in skill_row:
-                val_str = str(val).strip()
-                
-                if val_str in proficiency_map:
-                    numeric_vals.append(proficiency_map[val_str])
-                else:
-                    try:
-                        # Handles 1, 2, 5.1, etc.
-                        numeric_vals.append(float(val_str))
-                    except ValueError:
-                        numeric_vals.append(0.0)
-
-            # Calculate average for the specific group
-            avg_val = sum(numeric_vals) / len(numeric_vals) if numeric_vals else 0
-            categories.append(group_name)
-            values.append(avg_val)
+    # 3. Average score of each group in the Role
+    categories, values = talent.group_means(selected_staff, target_groups)
 
     if not categories:
         st.info(f"No skill data available for {role_name} group.")
@@ -626,23 +426,38 @@ except:
         st.write("logo")
 t2.title("Workforce Dashboard - Interactive Report")
 with t3:
+    # Sheets are fetched + parsed by a background worker, a rerun only reads the latest ready snapshot
+    refresher = get_refresher(SHEET_SOURCES)
     if st.button("🔄 Request Fresh Data"):
-        st.cache_data.clear()
-        html_schedule = get_html_content(URL_SCHEDULE, "schedule_cache.html", force_refresh=True)
-        html_talent = get_html_content(URL_TALENT, "talent_cache.html", force_refresh=True)
-    else:
-        html_schedule = get_html_content(URL_SCHEDULE, "schedule_cache.html")
-        html_talent = get_html_content(URL_TALENT, "talent_cache.html")
+        refresher.request_refresh()
+        st.toast("Refreshing sheets in the background...")
+    snapshot = refresher.latest()
+    # Only the caches derived from a sheet whose content hash changed are dropped
+    for source, digest in snapshot.hashes.items():
+        cache_registry.observe(source, digest)
+    st.caption(f"Data: {snapshot.age_label()}" + (" · refreshing" if refresher.refreshing else ""))
+    html_schedule = snapshot.contents["schedule"]
+    html_talent = snapshot.contents["talent"]
 
 # Process the HTML (from disk or memory)
 raw_v, raw_c = get_raw_data_and_colors(html_schedule) # Your existing schedule processor
-df, colors, err = rebuild_schedule(raw_v, raw_c)
+
+# Schedule window: defaults to the sheet's own start date and 2 weeks
+anchor_date, _ = schedule_model.find_anchor(raw_v)
+w_start, w_weeks, _ = st.columns((1, 1, 4))
+start_date = w_start.date_input("Schedule start", value=anchor_date.date() if anchor_date is not None else None)
+weeks = w_weeks.selectbox("Weeks", schedule_model.HORIZON_WEEKS)
+df, colors, err = rebuild_schedule(raw_v, raw_c, start_date, weeks)
+schedule_key = (snapshot.hashes["schedule"], str(start_date), weeks)
 
 # Store in session state for styling functions
-max_employee_row = len(df)
-tracker = ProjectTracker(html_schedule, max_employee_row+5)
+tracker = project_tracker.get_project_tracker(snapshot.hashes["schedule"], html_schedule)
 st.session_state.df = df
 st.session_state.colors = colors
+# Typed staff x day model (palette codes + kind flags) that the metrics run on. Versioned:
+# every new sheet version keeps a cell-level diff to the previous one and patches its metrics
+schedule_version = schedule_history.get_schedule_history().record(schedule_key, df, colors)
+st.session_state.schedule = schedule_version.model
 color_discrete_map = {
     "IT": "#da9694",
     "Head Coordinator": "#fabf8f",
@@ -654,6 +469,8 @@ color_discrete_map = {
     "Staff": "#eeeeee"
 }# --- Initialization ---
 df_talent = process_talent_with_roles(html_talent)
+# Canonical float32 staff x skill scores, shared by the radar, stacked bar and heatmap
+talent = talent_matrix.get_talent_matrix(snapshot.hashes["talent"], df_talent)
 #print(df_talent.head(10))
 df_summary = df_talent["Role"].value_counts().reset_index()
 total_count = len(df_talent)-1
@@ -663,8 +480,8 @@ with st.expander("Show/Hide Talent Reference", expanded=False):
     st.dataframe(df_talent, width='stretch', hide_index=True)
 
 with st.expander("Show/Hide Full Schedule Reference", expanded=False):
-    st.dataframe(st.session_state.df.style.apply(apply_styles, axis=None), width='stretch', hide_index=True)
-# Assuming 'max_employee_row' was identified during your schedule processing
+    css = schedule_version.css
+    st.dataframe(st.session_state.df.style.apply(apply_styles, axis=None, css=css), width='stretch', hide_index=True)
 # --- Top Section: Search ---
 #st.header("🚀 Talent Intelligence Portal")
 #st.header("🗺️ Workforce Talent Heatmap")
@@ -678,45 +495,52 @@ tracker.display_in_streamlit()
 master_df = tracker.all_projects_df # Here is your project list access
 
 if "df" in st.session_state:
-    train_list, free_list = get_detailed_metrics(st.session_state.df)
-    df_with_off, _ = get_metrics_summary(st.session_state.df, st.session_state.colors)
-
+    metrics = schedule_version.metrics
+    df_with_off, _ = get_metrics_summary(st.session_state.df, st.session_state.schedule)
+
+    with st.expander("🆕 What changed since last refresh", expanded=False):
+        diff = schedule_version.diff
+        if diff is None:
+            st.write("No earlier schedule version loaded yet.")
+        elif diff.empty:
+            st.write("No changes.")
+        else:
+            st.caption(diff.summary())
+            st.dataframe(
+                diff.changes.style.apply(apply_color_swatches, subset=["Before color", "After color"]),
+                width='stretch', hide_index=True
+            )
 
     # Layout: 3 Columns
     col1, col2, col3 = st.columns([1,3,2])
 
     with col1:
         st.markdown("##### 🎓 Training")
-        if train_list:
-            for item in train_list:
-                st.info(f"**{item['name']}**\n\n" + ", ".join(item['days']))
+        if not metrics.training.empty:
+            for row in metrics.training.itertuples():
+                st.info(f"**{row.Staff}**\n\n" + ", ".join(row.Days))
         else:
             st.write("Tidak ada yang training.")
 
     with col2:
-        # Grouping names by date to save space
-        free_by_date = {}
-        for _, row in st.session_state.df.iterrows():
-            for col in st.session_state.df.columns[1:15]:
-                if str(row[col]) == "0":
-                    free_by_date.setdefault(col, []).append(row["Staff"])
-
+        # Names grouped by date (precomputed per schedule snapshot)
         # Display in a compact grid
         st.markdown("##### 🟢 Free Resources")
-        if free_by_date:
-            for date, names in free_by_date.items():
+        if not metrics.free_by_date.empty:
+            for row in metrics.free_by_date.itertuples():
                 # Clean date (e.g., "Mon 12/05") : Names
-                st.write(f"**{date}**: {', '.join(names)}")
+                st.write(f"**{row.Day}**: {', '.join(row.Staff)}")
         else:
             st.write("None")
 
     with col3:
         st.markdown("##### 🗓️ Quota Izin")
+        week_cols = [c for c in df_with_off.columns if c.startswith('W') and c.endswith('_Off')]
         for _, row in df_with_off.iterrows():
-            total = row['W1_Off'] + row['W2_Off']
+            total = row[week_cols].sum()
             if total > 0:
                 label = f"{row['Staff']} ({total}/30)"
                 with st.expander(label):
-                    st.write(f"**Week 1:** {row['W1_Off']} days")
-                    st.write(f"**Week 2:** {row['W2_Off']} days")
-                    st.progress(total / 30) # Visual quota bar
+                    for week, col in enumerate(week_cols, start=1):
+                        st.write(f"**Week {week}:** {row[col]} days")
+                    st.progress(min(total / 30, 1.0)) # Visual quota bar
@@ -583,8 +583,7 @@ raw_v, raw_c = get_raw_data_and_colors(html_schedule) # Your existing schedule p
 df, colors, err = rebuild_schedule(raw_v, raw_c)
 
 # Store in session state for styling functions
-max_employee_row = len(df)
-tracker = ProjectTracker(html_schedule, max_employee_row+5)
+tracker = ProjectTracker(html_schedule)
 st.session_state.df = df
 st.session_state.colors = colors
 
@@ -1,18 +1,22 @@
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import re
 import streamlit as st
 from streamlit_extras.tags import tagger_component
-import os
-import time
 import pathlib
-from datetime import timedelta
 import plotly.express as px
 import plotly.graph_objects as go
-from io import StringIO
 
-from project_tracker import ProjectTracker
+import project_tracker
+from sheet_document import get_sheet_document
+from sheet_refresher import get_refresher
+import cache_registry
+import schedule_model
+import schedule_history
+import staff_plan
+import talent_matrix
+import talent_dates
+import skill_search
+import staff_recommender
+import staffing_solver
 import helper
 # --- 1. SCRAPER ---
 HTML_FILE = "schedule_cache.html"
@@ -21,6 +25,12 @@ TALENT_HTML = "talent_cache.html"
 URL_SCHEDULE = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQxy9OIle28SzGUOMwz8-jsLv1bWFl5iuZVU5E9DWwy1hUC9ni7HpZORR-Fa0WPaSzyboo229vPv5aN/pubhtml?gid=1836612665&single=true&widget=false&headers=false"
 URL_TALENT = "https://docs.google.com/spreadsheets/u/0/d/e/2PACX-1vTVsigeKQiKTO5GEwF0baT3AGzxQ9NIBHJM8cju5wuBd_W5ttuFNUSxfiXFgceBJ_pFOQ1jWMvPe_Cp/pubhtml/sheet?headers=false&gid=0"
 
+# Every published sheet the dashboard reads: (name, url, cache file)
+SHEET_SOURCES = (
+    ("schedule", URL_SCHEDULE, HTML_FILE),
+    ("talent", URL_TALENT, TALENT_HTML),
+)
+
 
 # This map follows your specific image headers
 TALENT_GROUPS = {
@@ -90,105 +100,59 @@ ROLES = {
         "New App": ["Vektor Work", "Revit"]
     }
 }
-def get_html_content(url, filename, force_refresh=False):
-    file_exists = os.path.exists(filename)
-    # Check if file is older than 1 hour
-    is_old = file_exists and (time.time() - os.path.getmtime(filename) > 3600)
-
-    if not file_exists or is_old or force_refresh:
-        response = requests.get(url)
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(response.text)
-        return response.text
-    
-    with open(filename, "r", encoding="utf-8") as f:
-        return f.read()
-
 # Test
 # print(to_human_date("05.02.16")) # Output: February 5th, 2016
+@cache_registry.depends_on("schedule")
 @st.cache_data(show_spinner="Processing Project list...")  # Cache for 1 hour
-def extract_project_table_simple(html_content, max_employee_idx):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    rows = soup.find_all('tr')
-    
-    start_row_idx = None
-    nr_col_idx = None
+def extract_project_table_simple(html_content):
+    doc = get_sheet_document(html_content)
+    rows = doc.cells
     server_col_idx = None
 
-    # 1. Locate the "Nr." starting point
-    for r_idx in range(max_employee_idx, len(rows)):
-        cells = rows[r_idx].find_all(['td', 'th'])
-        for c_idx, cell in enumerate(cells):
-            if cell.get_text(strip=True) == "Nr.":
-                nr_col_idx = c_idx
-                start_row_idx = r_idx
-                break
-        if start_row_idx: break
-
-    if start_row_idx is None:
+    # 1. Locate the first "Nr." header row straight from the document's token index
+    nr_rows = doc.rows_with("Nr.")
+    if not nr_rows:
         return pd.DataFrame()
+    start_row_idx = nr_rows[0]
+    nr_col_idx = next(c_idx for c_idx, (text, _, _) in enumerate(rows[start_row_idx])
+                      if text.strip().upper() == "NR.")
     # 2. Locate the "Server" column width
-    header_cells = rows[start_row_idx].find_all(['td', 'th'])
+    header_cells = rows[start_row_idx]
     for c_idx in range(nr_col_idx, len(header_cells)):
-        if "Server" in header_cells[c_idx].get_text(strip=True):
+        if "Server" in header_cells[c_idx][0]:
             server_col_idx = c_idx + 1
             break
 
     start_row_idx = start_row_idx - 1
-    # 3. Reconstruct a simple HTML table string for the selected area
-    table_html = "<table>"
+    # 3. Expand the selected area (colspans included) straight from the parsed cells
+    table_rows = []
     for r_idx in range(start_row_idx, len(rows)):
-        cells = rows[r_idx].find_all(['td', 'th'])
+        cells = rows[r_idx]
         if len(cells) > nr_col_idx:
-            # Check if 'Nr.' is empty after the header row to find the end
-            #if r_idx > start_row_idx and not cells[nr_col_idx].get_text(strip=True):
-            #    break
-            
-            # Extract only the columns between Nr. and Server
-            row_html = "".join([str(cells[i]) for i in range(nr_col_idx, server_col_idx + 1)])
-            table_html += f"<tr>{row_html}</tr>"
-    table_html += "</table>"
-
-    # 4. Use StringIO to read with Pandas
-    return pd.read_html(StringIO(table_html))[0]
-
+            row_vals = []
+            for text, _, colspan in cells[nr_col_idx:server_col_idx + 1]:
+                row_vals.extend([text or None] * colspan)
+            table_rows.append(row_vals)
+
+    # 4. Same typed frame pd.read_html used to return, without re-parsing HTML
+    df = pd.DataFrame(table_rows)
+    return df.apply(_to_numeric_or_keep)
+
+def _to_numeric_or_keep(col):
+    try:
+        return pd.to_numeric(col)
+    except (ValueError, TypeError):
+        return col
+
+@cache_registry.depends_on("schedule")
 @st.cache_data(show_spinner="Processing Schedule...")  # Cache for 1 hour
 def get_raw_data_and_colors(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    style_map = {}
-    style_tag = soup.find('style')
-    if style_tag:
-        matches = re.findall(r'\.(s\d+)\{[^}]*background-color:(#[a-fA-F0-9]{3,6})', style_tag.text)
-        style_map = {cls: color for cls, color in matches}
-
-    table = soup.find('table')
-    rows = table.find_all('tr')
-    
-    val_data, color_data = [], []
-
-    for row in rows:
-        v_row, c_row = [], []
-        cells = row.find_all(['td', 'th'])
-        for cell in cells:
-            colspan = int(cell.get('colspan', 1))
-            text = cell.get_text(strip=True)
-            cls = cell.get('class', [None])[0]
-            color = style_map.get(cls, "#FFFFFF")
-            for _ in range(colspan):
-                v_row.append(text)
-                c_row.append(color)
-        if v_row:
-            val_data.append(v_row)
-            color_data.append(c_row)
-
-    return pd.DataFrame(val_data), pd.DataFrame(color_data)
+    doc = get_sheet_document(html_content)
+    return pd.DataFrame(doc.values), pd.DataFrame(doc.color_grid("#FFFFFF"))
 
+@cache_registry.depends_on("talent")
 @st.cache_data(show_spinner="Processing Talent List...")
 def process_talent_with_roles(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    style_tag = soup.find('style')
-    
     # 1. Map CSS classes to Role names
     role_colors = {
         "#da9694": "IT", "#fabf8f": "Head Coordinator",
@@ -197,30 +161,24 @@ def process_talent_with_roles(html_content):
         "#d9d9d9": "Trainee"
     }
     
+    doc = get_sheet_document(html_content)
     color_map = {}
-    if style_tag:
-        import re
-        styles = re.findall(r'\.(s\d+)\{[^}]*background-color:(#[a-fA-F0-9]{6})', style_tag.text)
-        for class_name, hex_val in styles:
-            color_map[class_name] = role_colors.get(hex_val.lower(), "Staff")
-
-    # 2. Extract Data Rows
-    table = soup.find('table')
-    rows = table.find_all('tr')
-    headers = [cell.get_text(strip=True) for cell in rows[14].find_all(['td', 'th'])]
+    for class_name, hex_val in doc.class_map.items():
+        color_map[class_name] = role_colors.get(hex_val.lower(), "Staff")
+
+    # 2. Extract Data Rows (physical (text, class, colspan) cells of the shared parsed document)
+    headers = [text for text, _, _ in doc.cells_at(14)]
     
     raw_data = []
     role_list = []
     
-    for row in rows[15:]:
-        cells = row.find_all(['td', 'th'])
+    for cells in doc.cells[doc.first_grid_row(15):]:
         if len(cells) > 5:
             # Extract Text
-            text_cells = [c.get_text(strip=True) for c in cells]
+            text_cells = [text for text, _, _ in cells]
             
             # Extract Role from Column 3 (Index 2)
-            staff_cell = cells[2]
-            class_attr = staff_cell.get('class', [None])[0]
+            class_attr = cells[2][1]
             role = color_map.get(class_attr, "Staff")
             
             if text_cells[2]: # If Staff name exists
@@ -242,6 +200,7 @@ def process_talent_with_roles(html_content):
     return df_talent
 
 # --- 2. REBUILD (Including Weekends) ---
+@cache_registry.depends_on("talent")
 @st.cache_data(show_spinner="Processing Project list...")  # Cache for 1 hour
 def create_vertical_summary(df_summary, color_discrete_map, highlight_role=None):
     # Calculate midpoints for text placement
@@ -295,149 +254,36 @@ def create_vertical_summary(df_summary, color_discrete_map, highlight_role=None)
     
     return fig_v
 
-def rebuild_schedule(df_v, df_c):
-    # Find Anchor Date
-    date_pattern = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
-    start_date = None
-    anchor_col = 0
-
-    for r in range(min(15, len(df_v))):
-        for c in range(min(10, len(df_v.columns))):
-            match = re.search(date_pattern, str(df_v.iloc[r, c]))
-            if match:
-                start_date = pd.to_datetime(match.group(1), dayfirst=True)
-                anchor_col = c 
-                break
-        if start_date: break
-
-    if not start_date:
-        return None, None, "Could not find start date."
-
-    # Generate 14 Days Header
-    work_days = ["Staff"]
-    for i in range(14):
-        day = start_date + timedelta(days=i)
-        work_days.append(day.strftime('%a %d/%m'))
-
-    final_rows, color_rows = [], []
-    
-    # Start at Row 5 (Index 4)
-    for i in range(4, len(df_v)):
-        name = str(df_v.iloc[i, 1]).strip() 
-        
-        if name and name.lower() != "none" and name != "":
-            # --- THE FIX IS HERE ---
-            # Get the color for the name from the same coordinates as the value
-            name_color = df_c.iloc[i, 1] 
-            
-            # Values: [Name] + [14 days of data]
-            row_vals = [name] + df_v.iloc[i, anchor_col : anchor_col + 14].tolist()
-            
-            # Colors: [Name Color] + [14 days of colors]
-            row_cols = [name_color] + df_c.iloc[i, anchor_col : anchor_col + 14].tolist()
-            
-            # Padding to ensure 15 columns
-            while len(row_vals) < 15: row_vals.append("")
-            while len(row_cols) < 15: row_cols.append("#FFFFFF")
-            
-            final_rows.append(row_vals)
-            color_rows.append(row_cols)
+def rebuild_schedule(df_v, df_c, start_date=None, weeks=schedule_model.DEFAULT_WEEKS):
+    # Window of `weeks` weeks from start_date (default: the sheet's anchor date),
+    # sliced from the sheet's date -> column index
+    return schedule_model.build_window(df_v, df_c, start=start_date, weeks=weeks)
 
-    return pd.DataFrame(final_rows, columns=work_days), pd.DataFrame(color_rows, columns=work_days), None
 
+def apply_styles(x, css):
+    # Set text to black and apply background colors, from the per-snapshot CSS matrix
+    return pd.DataFrame(css, index=x.index, columns=x.columns)
 
-def apply_styles(x):
-    # Set text to black and apply background colors
-    style_df = pd.DataFrame('color: black; font-weight: 500;', index=x.index, columns=x.columns)
-    for r in range(len(x)):
-        for c in range(len(x.columns)):
-            bg = st.session_state.colors.iloc[r, c]
-            style_df.iloc[r, c] += f' background-color: {bg};'
-    return style_df
+def apply_color_swatches(col):
+    # Paint a column of hex colors with its own colors
+    return 'background-color: ' + col.astype(str) + ';'
 
-def get_metrics_summary(df_val, df_col):
-    # Adjust this hex code to the exact COLOR used in your sheet for "Day Off"
-    DAY_OFF_COLOR = "#ffff00" 
-    
-    # Week 1: Columns 1-7 | Week 2: Columns 8-14
-    # (Index 0 is the Name column)
-    w1_cols = df_col.iloc[:, 1:8]
-    w2_cols = df_col.iloc[:, 8:15]
-    
-    # Count occurrences of the color per row
-    df_val['W1_Off'] = (w1_cols == DAY_OFF_COLOR).sum(axis=1)
-    df_val['W2_Off'] = (w2_cols == DAY_OFF_COLOR).sum(axis=1)
+def get_metrics_summary(df_val, model):
+    # Day-off cells are pre-classified in the model (color == schedule_model.DAY_OFF_COLOR)
+    # One W<n>_Off column per 7-day block of the window, one reshape for all weeks
+    weekly_off = model.weekly_counts(schedule_model.DAY_OFF)
+    for week in range(weekly_off.shape[1]):
+        df_val[f'W{week + 1}_Off'] = weekly_off[:, week]
     
     # Identify Free Resources (Value 0)
-    # Checks if '0' exists anywhere in the 14 days for that employee
-    free_resources = df_val[df_val.iloc[:, 1:15].astype(str).eq('0').any(axis=1)]['Staff'].tolist()
+    # Checks if '0' exists anywhere in the window for that employee
+    free_resources = model.staff_with(schedule_model.FREE)
     
     return df_val, free_resources
-def get_detailed_metrics(df_val):
-    training_data = []
-    free_data = []
-
-    # Iterate through rows (employees)
-    for _, row in df_val.iterrows():
-        name = row["Staff"]
-        emp_training_days = []
-        emp_free_days = []
-
-        # Iterate through the 14 day columns
-        for col_name in df_val.columns[1:15]:
-            cell_value = str(row[col_name]).strip()
-            
-            # Identify Training
-            if "training" in cell_value.lower():
-                emp_training_days.append(col_name)
-            
-            # Identify Value 0 (Free)
-            if cell_value == "0":
-                emp_free_days.append(col_name)
-
-        if emp_training_days:
-            training_data.append({"name": name, "days": emp_training_days})
-        
-        if emp_free_days:
-            free_data.append({"name": name, "days": emp_free_days})
-
-    return training_data, free_data
-
-def score_skill(value):
-    val = str(value).strip().lower()
-    if val == 'm': return 6
-    if val == 'w': return 7
-    if val.isdigit(): return float(val)
-    return 0
-
-def get_mastery_score(value):
-    val = str(value).strip().upper()
-    mapping = {
-        '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, 
-        '5.1': 6, 'M': 7, 'W': 8
-    }
-    return mapping.get(val, 0)
 
-def create_stacked_skill_chart(staff_name, df_talent, talent_groups):
-    # Get staff row
-    row = df_talent[df_talent.iloc[:, 0] == staff_name].iloc[0]
-    
-    plot_data = []
-    for category, sub_skills in talent_groups.items():
-        for skill in sub_skills:
-            if skill in df_talent.columns:
-                val = row[skill]
-                score = get_mastery_score(val)
-                # Only include skills that have a value
-                if score > 0:
-                    plot_data.append({
-                        "Category": category,
-                        "Sub-Skill": skill,
-                        "Mastery Score": score,
-                        "Label": val
-                    })
-    
-    df_plot = pd.DataFrame(plot_data)
+def create_stacked_skill_chart(staff_name, talent, talent_groups):
+    # Rated skills of the staff member, read from the precomputed TalentMatrix
+    df_plot = talent.group_scores(staff_name, talent_groups)
     
     if df_plot.empty:
         return None
@@ -473,20 +319,13 @@ def create_stacked_skill_chart(staff_name, df_talent, talent_groups):
     
     return st.plotly_chart(fig, width='stretch')
 
-def create_proficiency_heatmap(df_talent):
-    # Force everything to string to ensure '5.1', 'M', and 'W' show up
-    mastery_levels = ['1', '2', '3', '4', '5', '5.1', 'M', 'W']
+def create_proficiency_heatmap(talent):
+    # Staff per (level, skill), counted once per talent snapshot ('5.1', 'M' and 'W' included)
+    mastery_levels = talent_matrix.MASTERY_LEVELS
     
-    skills = [c for c in df_talent.columns if c != "Staff" and  c != "Role"]
+    skills = talent.skills
     
-    agg_data = []
-    for level in mastery_levels:
-        level_counts = []
-        for skill in skills:
-            # Case-insensitive count for M/W and exact match for numbers
-            count = df_talent[skill].astype(str).str.strip().str.upper().eq(level.upper()).sum()
-            level_counts.append(count)
-        agg_data.append(level_counts)
+    agg_data = talent.level_counts.tolist()
 
     # Create Heatmap
     fig = go.Figure(data=go.Heatmap(
@@ -513,21 +352,45 @@ def create_proficiency_heatmap(df_talent):
     
     return fig
 
-def create_specialized_radar(selected_staff, df_talent, role_name, key=None):
+# Same idea as color_discrete_map: one fixed hex per category
+utilization_color_map = {
+    "Day Off": schedule_model.DAY_OFF_COLOR,
+    "Training": "#92cddc",
+    "Project": "#31869b",
+}
+
+def create_utilization_heatmap(plan, kind, start=None, end=None):
+    # Staff x week share of `kind` days, aggregated once per CSV version inside StaffPlan
+    weeks, shares = plan.weekly_utilization(start, end)
+    share = shares[kind]
+
+    fig = go.Figure(data=go.Heatmap(
+        z=share,
+        x=weeks.strftime('%d/%m/%y'),
+        y=plan.staff,
+        zmin=0,
+        zmax=1,
+        colorscale=[[0, "#FFFFFF"], [1, utilization_color_map[kind]]],
+        hovertemplate="%{y} · week of %{x}<br>" + kind + ": %{z:.0%}<extra></extra>",
+        colorbar=dict(title=kind, tickformat=".0%")
+    ))
+
+    fig.update_layout(
+        title=f"<b>Utilisasi per Minggu: {kind}</b>",
+        yaxis={'type': 'category', 'autorange': 'reversed'},
+        xaxis={'type': 'category'},
+        height=max(400, 14 * len(plan.staff)),
+        margin=dict(l=50, r=50, t=80, b=50)
+    )
+    return fig
+
+def create_specialized_radar(selected_staff, talent, role_name, key=None):
     """
     key is for streamlit specific
     Creates a radar chart based on specific role groups (IT, C, Z, or Staff).
-    Handles 'W'=8, 'M'=7, and numeric strings like '5.1'.
+    Scores come from the TalentMatrix: 1-5, '5.1'=6, 'M'=7, 'W'=8.
     """
-    # 1. Configuration & Mapping
-    # W is highest (8), M is below W (7)
-    proficiency_map = {
-        'W': 8.0, 'w': 8.0,
-        'M': 7.0, 'm': 7.0,
-        '': 0.0, None: 0.0
-    }
-    
-    # Use the ROLES dictionary we defined previously
+    # 1. Use the ROLES dictionary we defined previously
     # (Ensure the ROLES dict is defined in your script scope)
     target_groups = ROLES.get(role_name, {})
     
@@ -535,39 +398,13 @@ def create_specialized_radar(selected_staff, df_talent, role_name, key=None):
         st.error(f"Role group '{role_name}' not found.")
         return
 
-    # 2. Extract Staff Data
-    staff_data = df_talent[df_talent['Staff'] == selected_staff]
-    if staff_data.empty:
+    # 2. Locate the staff row
+    if talent.staff_index(selected_staff) is None:
         st.warning(f"No data for {selected_staff}")
         return
 
-    categories = []
-    values = []
-
-    # 3. Process each group in the Role
-    for group_name, skills in target_groups.items():
-        valid_skills = [s for s in skills if s in staff_data.columns]
-        
-        if valid_skills:
-            skill_row = staff_data[valid_skills].iloc[0]
-            numeric_vals = []
-            
-            for val in skill_row:
-                val_str = str(val).strip()
-                
-                if val_str in proficiency_map:
-                    numeric_vals.append(proficiency_map[val_str])
-                else:
-                    try:
-                        # Handles 1, 2, 5.1, etc.
-                        numeric_vals.append(float(val_str))
-                    except ValueError:
-                        numeric_vals.append(0.0)
-
-            # Calculate average for the specific group
-            avg_val = sum(numeric_vals) / len(numeric_vals) if numeric_vals else 0
-            categories.append(group_name)
-            values.append(avg_val)
+    # 3. Average score of each group in the Role
+    categories, values = talent.group_means(selected_staff, target_groups)
 
     if not categories:
         st.info(f"No skill data available for {role_name} group.")
@@ -626,21 +463,32 @@ except:
         st.error("logo")
 t2.title("Workforce Dashboard - Interactive Report")
 with t3:
+    # Sheets are fetched + parsed by a background worker, a rerun only reads the latest ready snapshot
+    refresher = get_refresher(SHEET_SOURCES)
     if st.button("🔄 Request Fresh Data", type="tertiary"):
-        st.cache_data.clear()
-        html_schedule = get_html_content(URL_SCHEDULE, "schedule_cache.html", force_refresh=True)
-        html_talent = get_html_content(URL_TALENT, "talent_cache.html", force_refresh=True)
-    else:
-        html_schedule = get_html_content(URL_SCHEDULE, "schedule_cache.html")
-        html_talent = get_html_content(URL_TALENT, "talent_cache.html")
+        refresher.request_refresh()
+        st.toast("Refreshing sheets in the background...")
+    snapshot = refresher.latest()
+    # Only the caches derived from a sheet whose content hash changed are dropped
+    for source, digest in snapshot.hashes.items():
+        cache_registry.observe(source, digest)
+    st.caption(f"Data: {snapshot.age_label()}" + (" · refreshing" if refresher.refreshing else ""))
+    html_schedule = snapshot.contents["schedule"]
+    html_talent = snapshot.contents["talent"]
 
 # Process the HTML (from disk or memory)
 raw_v, raw_c = get_raw_data_and_colors(html_schedule) # Your existing schedule processor
-df, colors, err = rebuild_schedule(raw_v, raw_c)
+
+# Schedule window: defaults to the sheet's own start date and 2 weeks
+anchor_date, _ = schedule_model.find_anchor(raw_v)
+w_start, w_weeks, _ = st.columns((1, 1, 4))
+start_date = w_start.date_input("Schedule start", value=anchor_date.date() if anchor_date is not None else None)
+weeks = w_weeks.selectbox("Weeks", schedule_model.HORIZON_WEEKS)
+df, colors, err = rebuild_schedule(raw_v, raw_c, start_date, weeks)
+schedule_key = (snapshot.hashes["schedule"], str(start_date), weeks)
 
 # Store in session state for styling functions
-max_employee_row = len(df)
-tracker = ProjectTracker(html_schedule, max_employee_row+5)
+tracker = project_tracker.get_project_tracker(snapshot.hashes["schedule"], html_schedule)
 
 # Your specific Hex Colors
 color_discrete_map = {
@@ -654,17 +502,96 @@ color_discrete_map = {
     "Staff": "#eeeeee"
 }# --- Initialization ---
 df_talent = process_talent_with_roles(html_talent)
+# Canonical float32 staff x skill scores, shared by the radar, stacked bar and heatmap
+talent = talent_matrix.get_talent_matrix(snapshot.hashes["talent"], df_talent)
+# Join dates parsed once per talent sheet (and day): "since" strings and tenure arrays
+talent_tenure = talent_dates.get_talent_tenure(snapshot.hashes["talent"], pd.Timestamp.today().normalize(), df_talent)
 #print(df_talent.head(10))
 df_summary = df_talent["Role"].value_counts().reset_index()
 total_count = len(df_talent)-1
 
 st.session_state.df = df
 st.session_state.colors = colors
+# Typed staff x day model (palette codes + kind flags) that the metrics run on. Versioned:
+# every new sheet version keeps a cell-level diff to the previous one and patches its metrics
+schedule_version = schedule_history.get_schedule_history().record(schedule_key, df, colors)
+st.session_state.schedule = schedule_version.model
 
 st.markdown(f"#### 👩‍💼👨‍💼 {total_count} Staff")
 staff_list = df_talent.iloc[:, 0].unique().tolist()
 selected_staff = st.selectbox("Pencarian Detail Staff", ["Tampilkan Semua..."] + staff_list)
 
+# --- Skill Search: (skill, level) bitsets x free days in the schedule window ---
+with st.expander("🔎 Skill Search", expanded=False):
+    skill_index = skill_search.get_skill_index(snapshot.hashes["talent"], talent)
+    s_skills, s_avail, s_rank = st.columns((3, 2, 2))
+    with s_skills:
+        wanted = st.multiselect("Skills", talent.skills)
+        terms = [
+            (skill, st.select_slider(f"Min. level: {skill}", talent_matrix.MASTERY_LEVELS, value='5', key=f"min_{skill}"))
+            for skill in wanted
+        ]
+    with s_avail:
+        schedule = st.session_state.schedule
+        week_starts = schedule.days[::schedule_model.DAYS_PER_WEEK]
+        availability = st.selectbox("Free in", ["Any time"] + [f"Week of {day}" for day in week_starts])
+        min_free = st.number_input("Min. free days", min_value=0, max_value=schedule_model.DAYS_PER_WEEK, value=1)
+    with s_rank:
+        rank_by = st.selectbox("Rank by", ["Selected skills", "All skills"] + list(ROLES))
+
+    if availability == "Any time":
+        free_days, min_free = None, 0
+    else:
+        week = [f"Week of {day}" for day in week_starts].index(availability)
+        days = slice(week * schedule_model.DAYS_PER_WEEK, (week + 1) * schedule_model.DAYS_PER_WEEK)
+        free_days = skill_index.free_days(schedule, days)
+
+    rank_skills = None
+    if rank_by == "All skills":
+        rank_skills = talent.skills
+    elif rank_by in ROLES:
+        rank_skills = [skill for skills in ROLES[rank_by].values() for skill in skills]
+
+    if terms or free_days is not None:
+        results = skill_index.search(terms, free_days, min_free, rank_skills)
+        st.caption(f"{len(results)} staff")
+        st.dataframe(results, width='stretch', hide_index=True)
+
+# --- Staff Recommender: skill fit x free days for open projects ---
+window_dates = pd.date_range(start_date or anchor_date, periods=len(st.session_state.schedule.days))
+with st.expander("🧩 Staff Recommender", expanded=False):
+    recommender = staff_recommender.StaffRecommender(talent, skill_index, st.session_state.schedule, TALENT_GROUPS)
+    open_projects = tracker.all_projects_df[tracker.all_projects_df['Category'].isin(staffing_solver.OPEN_CATEGORIES)]
+    r_project, r_profile, r_k = st.columns((3, 3, 1))
+    with r_project:
+        # Chosen by row position: the same project name can be listed in several categories
+        project_labels = (open_projects['Projekt'] + " (" + open_projects['Category'].astype(str) + ")").tolist()
+        project_choice = st.selectbox("Project", [None] + list(range(len(open_projects))),
+                                      format_func=lambda i: "All open projects" if i is None else project_labels[i])
+    with r_profile:
+        categories = st.multiselect("Required skills", list(TALENT_GROUPS), default=list(ROLES["Staff"]))
+    with r_k:
+        top_k = st.number_input("Top", min_value=1, max_value=20, value=staff_recommender.DEFAULT_TOP_K)
+
+    if categories and not open_projects.empty:
+        if project_choice is not None:
+            open_projects = open_projects.iloc[[project_choice]]
+        ranking = recommender.recommend(open_projects, recommender.profile(categories), window_dates, top_k)
+        st.dataframe(ranking, width='stretch', hide_index=True)
+
+# --- Staffing Plan: every open project at once, free days as capacity ---
+with st.expander("🗂️ Staffing Plan", expanded=False):
+    st.caption("Optimal assignment for all ON PROGRESS and AUFTRAG projects over the required skills above.")
+    all_open = tracker.all_projects_df[tracker.all_projects_df['Category'].isin(staffing_solver.OPEN_CATEGORIES)]
+    if categories and not all_open.empty:
+        # Solved once per schedule window, talent sheet and skill selection, not on every rerun
+        staffing = staffing_solver.get_staffing_plan(schedule_key, snapshot.hashes["talent"], tuple(categories),
+                                                     recommender, all_open, recommender.profile(categories),
+                                                     window_dates)
+        st.metric("Total skill fit", f"{staffing.total_fit:.1f}", f"{int(staffing.days.sum())} person-days staffed")
+        st.dataframe(staffing.coverage, width='stretch', hide_index=True)
+        st.dataframe(staffing.assignments, width='stretch', hide_index=True)
+
 # Define Highlight Role
 current_role = None
 if selected_staff != "Tampilkan Semua...":
@@ -699,28 +626,25 @@ with col_main:
 
         with col_work:
             from streamlit_avatar import avatar
-            staff_profile = df_talent[
-                df_talent['Staff'].str.contains(selected_staff, case=False, na=False)
-            ].reset_index()
+            since, tenure = talent_tenure.of(selected_staff)
             avatar(
                 [
                     {
                         "url": "https://picsum.photos/id/237/300/300",
                         "size": 40,
                         "title": f"{selected_staff} | 👦👩",
-                        "caption": f"{helper.to_human_date(staff_profile['Date'][0])}  💼 {helper.count_time_since(staff_profile['Date'][0])}",
+                        "caption": f"{since}  💼 {tenure}",
                         "key": "avatar1",
                     }
                 ]
             )
             st.markdown("#### 🚀 Projects")
             # Filter projects from your ProjectTracker instance
-            staff_projects = tracker.all_projects_df[
-                tracker.all_projects_df['Coordinator'].str.contains(selected_staff, case=False, na=False)
-            ].reset_index()
+            staff_projects = tracker.projects_of(selected_staff).reset_index()
 
             if not staff_projects.empty:
-                helper.render_project_section(staff_projects, "PROJECTS", "#ADADAD")
+                helper.render_project_section(staff_projects, "PROJECTS", "#ADADAD",
+                                              cache_key=(snapshot.hashes["schedule"], selected_staff))
             else:
                 st.info("No active projects.")
 
@@ -729,11 +653,11 @@ with col_main:
             # This shows the radar chart most relevant to their 'Head Coordinator' role
             tabs = st.tabs(["Staff Skills", "Control (C)", "IT Systems", "Additional (Z)", "FULL"])
             
-            with tabs[0]: create_specialized_radar(selected_staff, df_talent, "Staff", key="main_staff")
-            with tabs[1]: create_specialized_radar(selected_staff, df_talent, "C", key="main_it")
-            with tabs[2]: create_specialized_radar(selected_staff, df_talent, "IT", key="main_c")
-            with tabs[3]: create_specialized_radar(selected_staff, df_talent, "Z", key="main_z")
-            with tabs[4]: create_stacked_skill_chart(selected_staff, df_talent, TALENT_GROUPS)
+            with tabs[0]: create_specialized_radar(selected_staff, talent, "Staff", key="main_staff")
+            with tabs[1]: create_specialized_radar(selected_staff, talent, "C", key="main_it")
+            with tabs[2]: create_specialized_radar(selected_staff, talent, "IT", key="main_c")
+            with tabs[3]: create_specialized_radar(selected_staff, talent, "Z", key="main_z")
+            with tabs[4]: create_stacked_skill_chart(selected_staff, talent, TALENT_GROUPS)
 
         st.divider()
 
@@ -741,56 +665,80 @@ with col_main:
         st.markdown("#### 🔍 Full Skill Breakdown")
     else:
         # Full Team Heatmap (if no one is selected)
-        fig_heat = create_proficiency_heatmap(df_talent)
+        fig_heat = create_proficiency_heatmap(talent)
         st.plotly_chart(fig_heat, width='stretch')
 st.divider()
 
 
 if "df" in st.session_state:
-    train_list, free_list = get_detailed_metrics(st.session_state.df)
-    df_with_off, _ = get_metrics_summary(st.session_state.df, st.session_state.colors)
-
+    metrics = schedule_version.metrics
+    df_with_off, _ = get_metrics_summary(st.session_state.df, st.session_state.schedule)
+
+    with st.expander("🆕 What changed since last refresh", expanded=False):
+        diff = schedule_version.diff
+        if diff is None:
+            st.write("No earlier schedule version loaded yet.")
+        elif diff.empty:
+            st.write("No changes.")
+        else:
+            st.caption(diff.summary())
+            st.dataframe(
+                diff.changes.style.apply(apply_color_swatches, subset=["Before color", "After color"]),
+                width='stretch', hide_index=True
+            )
 
     # Layout: 3 Columns
     col1, col2, col3 = st.columns([1,3,2])
 
     with col1:
         st.markdown("##### 🎓 Training")
-        if train_list:
-            for item in train_list:
-                st.info(f"**{item['name']}**\n\n" + ", ".join(item['days']))
+        if not metrics.training.empty:
+            for row in metrics.training.itertuples():
+                st.info(f"**{row.Staff}**\n\n" + ", ".join(row.Days))
         else:
             st.write("Tidak ada yang training.")
 
     with col2:
-        # Grouping names by date to save space
-        free_by_date = {}
-        for _, row in st.session_state.df.iterrows():
-            for col in st.session_state.df.columns[1:15]:
-                if str(row[col]) == "0":
-                    free_by_date.setdefault(col, []).append(row["Staff"])
-
+        # Names grouped by date (precomputed per schedule snapshot)
         # Display in a compact grid
         st.markdown("##### 🟢 Free Resources")
-        if free_by_date:
-            for date, names in free_by_date.items():
+        if not metrics.free_by_date.empty:
+            for row in metrics.free_by_date.itertuples():
                 # Clean date (e.g., "Mon 12/05") : Names
-                st.write(f"**{date}**: {', '.join(names)}")
+                st.write(f"**{row.Day}**: {', '.join(row.Staff)}")
         else:
             st.write("None")
 
     with col3:
         st.markdown("##### 🗓️ Quota Izin")
+        week_cols = [c for c in df_with_off.columns if c.startswith('W') and c.endswith('_Off')]
         for _, row in df_with_off.iterrows():
-            total = row['W1_Off'] + row['W2_Off']
+            total = row[week_cols].sum()
             if total > 0:
                 label = f"{row['Staff']} ({total}/30)"
                 with st.expander(label):
-                    st.write(f"**Week 1:** {row['W1_Off']} days")
-                    st.write(f"**Week 2:** {row['W2_Off']} days")
-                    st.progress(total / 30) # Visual quota bar
+                    for week, col in enumerate(week_cols, start=1):
+                        st.write(f"**Week {week}:** {row[col]} days")
+                    st.progress(min(total / 30, 1.0)) # Visual quota bar
 
 
+# --- Year Utilization (Mitarbeiterplanung.csv) ---
+with st.expander("📈 Year Utilization", expanded=False):
+    plan = staff_plan.get_staff_plan(staff_plan.PLAN_CSV)
+    if plan is None:
+        st.info(f"No staff plan found at {staff_plan.PLAN_CSV}.")
+    else:
+        all_weeks, _ = plan.weekly_utilization()
+        years = sorted(set(all_weeks.year), reverse=True)
+        u_kind, u_year, _ = st.columns((2, 1, 3))
+        kind = u_kind.radio("Utilization", list(utilization_color_map), horizontal=True)
+        year = u_year.selectbox("Year", ["Last 52 weeks"] + years)
+        if year == "Last 52 weeks":
+            u_start, u_end = all_weeks[-52] if len(all_weeks) > 52 else None, None
+        else:
+            u_start, u_end = f"{year}-01-01", f"{year}-12-31"
+        st.plotly_chart(create_utilization_heatmap(plan, kind, u_start, u_end), width='stretch')
+
 #reduce top padding and app header to be transparent (check .streamlit/config.toml)
 st.markdown(
     """
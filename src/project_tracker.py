@@ -1,22 +1,79 @@
 import re
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-from bs4 import BeautifulSoup
+import cache_registry
 import helper
+from sheet_document import get_sheet_document
+
+# Section order of the sheet, also the order of the project table
+CATEGORIES = ('PROJECT SELESAI', 'ON PROGRESS', 'REGISTER & POINT', 'DOWNLOAD', 'AUFTRAG')
+# Virtual column of each text field ('File' is the color of column 12, not its text)
+TEXT_FIELDS = {
+    "Nr.": 2, "Projekt": 5, "to Bali": 7, "to Swiss": 8, "Time": 9, "Priority": 10,
+    "Coordinator": 11, "over time": 13, "over date": 14, "Server": 15,
+}
+FILE_COL = 12
+COLUMNS = ["Category", "Nr.", "Projekt", "to Bali", "to Swiss", "Time", "Priority", "Coordinator", "File",
+           "over time", "over date", "Server"]
+# Virtual column whose background each displayed column (COLUMNS minus Category) takes
+STYLE_COLS = [0, 2, 5, 6, 7, 8, 12, 12, 13, 14, 15]
+DEFAULT_COLOR = "#ffffff"
+# Coordinators are written "Esa/Rika", "Alink/ De Suka"
+COORDINATOR_SEPARATORS = re.compile(r"[/,&+]")
+
+
+def _category_of(row_text):
+    """Section a title row opens, or None for any other row."""
+    if "SELESAI" in row_text or "PROJECT DONE" in row_text:
+        return 'PROJECT SELESAI'
+    if "ON PROGRESS" in row_text:
+        return 'ON PROGRESS'
+    if "REGISTER" in row_text or "POINT" in row_text:
+        return 'REGISTER & POINT'
+    if "DOWNLOAD" in row_text:
+        return 'DOWNLOAD'
+    if "AUFTRAG" in row_text:
+        return 'AUFTRAG'
+    return None
+
+
+def locate_sections(doc):
+    """
+    {category: body rows} of the project tables of a schedule SheetDocument, found in one
+    lookup of its "Nr." header rows (the staff grid above never has such a cell). A section
+    title seen twice keeps its rows together, in sheet order.
+    """
+    sections = {}
+    for title, _, body in doc.sections("Nr."):
+        if title is None:
+            continue
+        category = _category_of(" ".join(text for text in doc.values[title] if text).upper())
+        if category:
+            sections.setdefault(category, []).extend(body)
+    return sections
+
 
 class ProjectTracker:
-    def __init__(self, html_content, max_employee_idx):
-        self.html_content = html_content
-        self.max_employee_idx = max_employee_idx
+    """
+    The project list below the schedule grid, as one columnar table built while parsing:
+
+    - projects:    Category (categorical, CATEGORIES order) + text fields + File color, sorted by category
+    - style_codes: (N, len(STYLE_COLS)) palette codes of the displayed cell backgrounds
+    - palette:     distinct hex colors
+
+    get_category_df() is a slice of `projects`, projects_of() a lookup in a
+    normalized coordinator name -> row positions index.
+
+    Read-only once built (see get_project_tracker): the arrays are not writeable and
+    the frames handed out are copies.
+    """
+
+    def __init__(self, html_content):
         self.color_map = {}
-        self.categories = {
-            'PROJECT SELESAI': [],
-            'ON PROGRESS': [],
-            'REGISTER & POINT': [],
-            'DOWNLOAD': [],
-            'AUFTRAG': []
-        }
-        self._process_data()
+        self.categories = CATEGORIES
+        self._process_data(html_content)
 
     @staticmethod
     def format_date(date_str):
@@ -24,136 +81,104 @@ class ProjectTracker:
             return ""
         # Handle the specific 05.02.16 format
         return helper.to_human_date(date_str)
-    def _process_data(self):
-        """Parses HTML and populates the categories dictionary."""
-        soup = BeautifulSoup(self.html_content, 'html.parser')
-        
-        # 1. Build Color Map
-        style_tag = soup.find('style')
-        if style_tag:
-            styles = re.findall(r'\.(s\d+)\{[^}]*background-color:(#[a-fA-F0-9]{6})', style_tag.text)
-            self.color_map = {class_name: hex_val for class_name, hex_val in styles}
-
-        table = soup.find('table')
-        if not table:
-            return
-        rows = table.find_all('tr')
-        
-        # 2. Extract Virtual Rows
-        raw_data = []
-        for r_idx in range(self.max_employee_idx, len(rows)):
-            cells = rows[r_idx].find_all(['td', 'th'])
-            virtual_row = []
-            for cell in cells:
-                colspan = int(cell.get('colspan', 1))
-                text = cell.get_text(strip=True)
-                class_attr = cell.get('class', [None])[0]
-                bg_color = self.color_map.get(class_attr, "#ffffff")
-                for _ in range(colspan):
-                    virtual_row.append({'text': text, 'color': bg_color})
-            
-            if virtual_row:
-                while len(virtual_row) <= 15: # Padded to match your highest index (15)
-                    virtual_row.append({'text': '', 'color': '#ffffff'})
-                raw_data.append(virtual_row)
-
-        # 3. Categorize
-        current_cat = None
-        for row in raw_data:
-            row_text = " ".join([c['text'] for c in row if c['text']]).upper()
-            
-            if "SELESAI" in row_text or "PROJECT DONE" in row_text:
-                current_cat = 'PROJECT SELESAI'
-                continue
-            elif "ON PROGRESS" in row_text:
-                current_cat = 'ON PROGRESS'
-                continue
-            elif "REGISTER" in row_text or "POINT" in row_text:
-                current_cat = 'REGISTER & POINT'
-                continue
-            elif "DOWNLOAD" in row_text:
-                current_cat = 'DOWNLOAD'
-                continue
-            elif "AUFTRAG" in row_text:
-                current_cat = 'AUFTRAG'
-                continue
-            
-            nr_val = row[2]['text']
-            if nr_val and nr_val.lower() != "nr." and current_cat:
-                self.categories[current_cat].append(row)
+
+    def _process_data(self, html_content):
+        """Builds the project table from the shared parsed schedule document."""
+        doc = get_sheet_document(html_content)
+
+        # 1. Color Map (parsed once with the document), colors interned into a palette
+        self.color_map = doc.class_map
+        self.palette = [DEFAULT_COLOR]
+        color_codes = {DEFAULT_COLOR: 0}
+
+        def code_of(cls):
+            color = self.color_map.get(cls, DEFAULT_COLOR)
+            return color_codes.setdefault(color, len(color_codes))
+
+        # 2. Sections come from the document's token index: every "Nr." table under a known title
+        cats, texts, style_codes = [], [], []
+        for category, rows in locate_sections(doc).items():
+            for g_idx in rows:
+                values, classes = doc.values[g_idx], doc.classes[g_idx]
+                nr_val = values[TEXT_FIELDS["Nr."]] if len(values) > TEXT_FIELDS["Nr."] else ""
+                if not nr_val or nr_val.lower() == "nr.":
+                    continue
+                cats.append(category)
+                texts.append([values[i] if i < len(values) else "" for i in TEXT_FIELDS.values()])
+                style_codes.append([code_of(classes[i]) if i < len(classes) else 0 for i in STYLE_COLS])
+        self.palette = list(color_codes)
+
+        # 3. Columns, sorted by section (stable: sheet order inside a section)
+        category = pd.Categorical(cats, categories=CATEGORIES)
+        order = np.argsort(category.codes, kind="stable")
+        text_cols = np.array(texts, dtype=object).reshape(len(texts), len(TEXT_FIELDS))[order]
+        self.style_codes = np.array(style_codes, dtype=np.uint16).reshape(len(texts), len(STYLE_COLS))[order]
+        file_codes = self.style_codes[:, STYLE_COLS.index(FILE_COL)]
+
+        columns = {"Category": category[order]}
+        columns.update({name: text_cols[:, j] for j, name in enumerate(TEXT_FIELDS)})
+        columns["File"] = pd.Categorical.from_codes(file_codes, categories=self.palette)
+        self.projects = pd.DataFrame(columns, columns=COLUMNS)
+        self._offsets = np.searchsorted(category.codes[order], np.arange(len(CATEGORIES) + 1))
+        self._coordinator_rows = self._index_coordinators(self.projects["Coordinator"])
+        for arr in (self.style_codes, self._offsets, *self._coordinator_rows.values()):
+            arr.flags.writeable = False
+
+    @staticmethod
+    def _index_coordinators(coordinators):
+        """helper.name_key of every coordinator of a row -> positions of its rows."""
+        rows = {}
+        for pos, text in enumerate(coordinators):
+            for name in COORDINATOR_SEPARATORS.split(text or ""):
+                key = helper.name_key(name)
+                if key:
+                    rows.setdefault(key, []).append(pos)
+        return {key: np.unique(positions) for key, positions in rows.items()}
+
+    def _section(self, category_name):
+        if category_name not in CATEGORIES:
+            return slice(0, 0)
+        i = CATEGORIES.index(category_name)
+        return slice(self._offsets[i], self._offsets[i + 1])
 
     def get_category_df(self, category_name):
         """Returns a standard DataFrame for a specific category."""
-        rows = self.categories.get(category_name, [])
-        if not rows:
-            return pd.DataFrame()
-        
-        data = []
-        for r in rows:
-            data.append({
-                "Category": category_name,
-                "Nr.": r[2]['text'],
-                "Projekt": r[5]['text'], 
-                "to Bali": r[7]['text'],
-                "to Swiss": r[8]['text'],
-                "Time": r[9]['text'],
-                "Priority": r[10]['text'],
-                "Coordinator": r[11]['text'],
-                "File": r[12]['color'],
-                "over time": r[13]['text'],
-                "over date": r[14]['text'],
-                "Server": r[15]['text'] 
-            })
-        return pd.DataFrame(data)
+        return self.projects.iloc[self._section(category_name)].reset_index(drop=True)
 
     @property
     def all_projects_df(self):
-        """Access a single DataFrame containing all projects from all categories."""
-        all_dfs = [self.get_category_df(cat) for cat in self.categories.keys()]
-        return pd.concat(all_dfs, ignore_index=True) if all_dfs else pd.DataFrame()
+        """Access a single DataFrame containing all projects from all categories (built once)."""
+        return self.projects.copy(deep=False)  # copy-on-write: callers never touch the shared table
+
+    def projects_of(self, staff):
+        """Projects `staff` coordinates (alone or shared, e.g. "Esa/Rika"), in table order."""
+        rows = self._coordinator_rows.get(helper.name_key(staff))
+        return self.projects.iloc[rows if rows is not None else []]
 
     def display_in_streamlit(self):
         """Renders the styled tables in Streamlit."""
-        order = ['PROJECT SELESAI', 'ON PROGRESS', 'REGISTER & POINT', 'DOWNLOAD', 'AUFTRAG']
-        for cat_name in order:
-            rows = self.categories[cat_name]
-            if not rows:
+        css_palette = np.array([f"background-color: {c}; color: black;" for c in self.palette], dtype=object)
+        for cat_name in CATEGORIES:
+            section = self._section(cat_name)
+            df = self.get_category_df(cat_name).drop(columns="Category")
+            if df.empty:
                 continue
 
-            text_list = []
-            color_list = []
-            for r in rows:
-                text_list.append({
-                    "Nr.": r[2]['text'],
-                    "Projekt": r[5]['text'], 
-                    "to Bali": r[7]['text'],
-                    "to Swiss": r[8]['text'],
-                    "Time": r[9]['text'],
-                    "Priority": r[10]['text'],
-                    "Coordinator": r[11]['text'],
-                    "File": r[12]['color'],
-                    "over time": r[13]['text'],
-                    "over date": r[14]['text'],
-                    "Server": r[15]['text'] 
-                })
-                color_list.append([
-                    r[0]['color'], r[2]['color'], r[5]['color'], 
-                    r[6]['color'], r[7]['color'], r[8]['color'],
-                    r[12]['color'], r[12]['color'],r[13]['color'], r[14]['color'], 
-                    r[15]['color']
-                ])
-
-            df = pd.DataFrame(text_list)
+            css = pd.DataFrame(css_palette[self.style_codes[section]], index=df.index, columns=df.columns)
             st.markdown(f"###### 📋 {cat_name}")
-            
-            styled_df = df.style.apply(
-                lambda x: [f"background-color: {c}; color: black;" for c in color_list[x.name]], 
-                axis=1
-            )
-            
+
+            styled_df = df.style.apply(lambda _: css, axis=None)
+
             st.dataframe(
-                styled_df, 
-                width='stretch', 
+                styled_df,
+                width='stretch',
                 hide_index=True,
                 column_config={"Projekt": st.column_config.Column(width=250)}
-            )
\ No newline at end of file
+            )
+
+
+@cache_registry.depends_on("schedule")
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_project_tracker(html_hash, _html_content):
+    """One immutable ProjectTracker per schedule content hash."""
+    return ProjectTracker(_html_content)
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from schedule_metrics import ScheduleMetrics
+from schedule_model import ScheduleModel
+from schedule_styles import cell_css, patched_css
+
+# Parsed schedule versions kept per process
+MAX_VERSIONS = 8
+
+
+def _row_keys(staff):
+    """(name, n-th occurrence) per row, so repeated names still align one to one."""
+    names = pd.Series(staff, dtype=object)
+    return pd.MultiIndex.from_arrays([names, names.groupby(names).cumcount()])
+
+
+def _cells(model, rows, cols):
+    """(values, colors) object arrays of the cells at (rows, cols)."""
+    return (np.asarray(model.value_labels, dtype=object)[model.value_codes[rows, cols]],
+            np.asarray(model.palette, dtype=object)[model.color_codes[rows, cols]])
+
+
+class ScheduleDiff:
+    """Cell-level changes between two ScheduleModels, aligned by staff name and day label."""
+
+    COLUMNS = ["Staff", "Day", "Before", "After", "Before color", "After color", "Change"]
+
+    def __init__(self, old, new, cells=None):
+        if cells is None:
+            old_keys, new_keys = _row_keys(old.staff), _row_keys(new.staff)
+            rows = old_keys.get_indexer(new_keys)            # old row per new row, -1 = added
+            cols = pd.Index(old.days).get_indexer(new.days)  # old column per new day, -1 = outside old window
+        else:
+            # Same staff and days, changed cells given by ScheduleModel.changed_cells
+            rows, cols = np.arange(len(new.staff)), np.arange(len(new.days))
+
+        self.added_staff = new.staff[rows < 0].tolist()
+        self.removed_staff = old.staff[np.setdiff1d(np.arange(len(old.staff)), rows[rows >= 0])].tolist()
+
+        # 1. Compare the shared block in one shot (unless the changed cells are known)
+        new_rows, new_cols = np.flatnonzero(rows >= 0), np.flatnonzero(cols >= 0)
+        if cells is None:
+            sub = np.ix_(rows[new_rows], cols[new_cols])
+            new_sub = np.ix_(new_rows, new_cols)
+            cells = (old.values[sub] != new.values[new_sub]) | (old.colors[sub] != new.colors[new_sub])
+        r, c = np.nonzero(cells)
+
+        # 2. Tidy frame of the changed cells only
+        before_v, before_c = _cells(old, rows[new_rows[r]], cols[new_cols[c]])
+        after_v, after_c = _cells(new, new_rows[r], new_cols[c])
+        value_changed, color_changed = before_v != after_v, before_c != after_c
+        change = np.where(value_changed & color_changed, "Value + Color", np.where(value_changed, "Value", "Color"))
+        self.changes = pd.DataFrame({
+            "Staff": new.staff[new_rows[r]],
+            "Day": np.asarray(new.days, dtype=object)[new_cols[c]],
+            "Before": before_v,
+            "After": after_v,
+            "Before color": before_c,
+            "After color": after_c,
+            "Change": change,
+        }, columns=self.COLUMNS)
+        self.changed_staff = list(pd.unique(self.changes["Staff"]))
+
+    @property
+    def empty(self):
+        return self.changes.empty and not self.added_staff and not self.removed_staff
+
+    def summary(self):
+        parts = [f"{len(self.changes)} cell(s) changed for {len(self.changed_staff)} staff"]
+        if self.added_staff:
+            parts.append(f"added: {', '.join(self.added_staff)}")
+        if self.removed_staff:
+            parts.append(f"removed: {', '.join(self.removed_staff)}")
+        return " · ".join(parts)
+
+
+class ScheduleVersion:
+    """
+    One recorded schedule window: its model, the diff to the version recorded before it, and
+    the metrics and cell styles the pages show. When both versions have the same staff and days,
+    the metrics and styles are patched on the edited rows of the previous version's.
+    """
+
+    def __init__(self, key, model, previous=None):
+        self.key = key                  # (content hash, start date, weeks)
+        self.model = model
+        self.created_at = time.time()
+        self.previous_key = previous.key if previous else None
+
+        cells, names = model.changed_cells(previous.model) if previous else (None, None)
+        if cells is None:
+            self.diff = ScheduleDiff(previous.model, model) if previous else None
+            self.metrics = ScheduleMetrics(model)
+            self.css = cell_css(model)
+        else:
+            self.diff = ScheduleDiff(previous.model, model, cells)
+            rows = np.flatnonzero(cells.any(axis=1))
+            self.metrics = previous.metrics.patched(model, rows)
+            self.css = patched_css(previous.css, model, np.union1d(rows, np.flatnonzero(names)))
+
+
+class ScheduleHistory:
+    """
+    Last MAX_VERSIONS parsed schedule versions of this process.
+
+    record() is called with every window the pages build. While a window's content stays the same
+    its latest version comes back as is; any other content (new, or back to an earlier one) is a new
+    version, diffed against that latest version of the window or, for a window not seen yet, the
+    latest version of other content. The model is patched from that version's when the staff and
+    days are the same, and reused outright when the content was seen before.
+    """
+
+    def __init__(self, max_versions=MAX_VERSIONS):
+        self._versions = deque(maxlen=max_versions)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Latest version recorded for `key`, or None."""
+        for version in reversed(self._versions):
+            if version.key == key:
+                return version
+        return None
+
+    def _previous(self, key):
+        _, *window = key
+        same_window = [v for v in reversed(self._versions) if list(v.key[1:]) == window]
+        if same_window:
+            return same_window[0]
+        return next((v for v in reversed(self._versions) if v.key[0] != key[0]), None)
+
+    def record(self, key, df_val, df_col):
+        with self._lock:
+            previous = self._previous(key)
+            if previous is not None and previous.key == key:
+                return previous
+            seen = self.get(key)
+            model = seen.model if seen else previous.model.patched(df_val, df_col) if previous else None
+            version = ScheduleVersion(key, model or ScheduleModel.from_frames(df_val, df_col), previous)
+            self._versions.append(version)
+            return version
+
+
+@st.cache_resource(show_spinner=False)
+def get_schedule_history():
+    """Process-wide ScheduleHistory."""
+    return ScheduleHistory()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from schedule_model import FREE, TRAINING, KIND_LABELS
+
+
+class ScheduleMetrics:
+    """
+    Training / free-day metrics of a ScheduleModel, computed in one vectorized pass.
+
+    - events:       tidy (Staff, Day, Kind) frame, one row per free or training cell,
+                    in sheet order (staff by staff, day by day)
+    - training:     Staff -> Days (list of day labels), staff with at least one training day
+    - free_days:    Staff -> Days, staff with at least one free ("0") day
+    - free_by_date: Day -> Staff (list of names) + Count, dates in first-seen order
+
+    Everything is assembled from the day indices of each row, so patched() only redoes the edited rows.
+    """
+
+    def __init__(self, model, kinds=(FREE, TRAINING)):
+        self.kinds = kinds
+        self._row_days = {kind: self._days_of(model, kind, np.arange(len(model.staff))) for kind in kinds}
+        self._build(model)
+
+    def patched(self, model, rows):
+        """
+        Metrics of `model`, an edit of this one's model (same staff and days) touching only `rows`.
+        Only those rows are scanned, and only the frames whose kinds changed are rebuilt.
+        """
+        metrics = ScheduleMetrics.__new__(ScheduleMetrics)
+        metrics.kinds = self.kinds
+        metrics._row_days = {}
+        changed = set()
+        for kind, row_days in self._row_days.items():
+            row_days = list(row_days)
+            for row, days in zip(rows, self._days_of(model, kind, rows)):
+                if not np.array_equal(days, row_days[row]):
+                    row_days[row] = days
+                    changed.add(kind)
+            metrics._row_days[kind] = row_days
+
+        labels = np.asarray(model.days, dtype=object)
+        metrics.events = metrics._events(model, labels) if changed else self.events
+        metrics.training = metrics._by_staff(model, labels, TRAINING) if TRAINING in changed else self.training
+        metrics.free_days = metrics._by_staff(model, labels, FREE) if FREE in changed else self.free_days
+        metrics.free_by_date = metrics._by_day(model, labels, FREE) if FREE in changed else self.free_by_date
+        return metrics
+
+    @staticmethod
+    def _days_of(model, kind, rows):
+        # One nonzero() over the rows, split back into one day index array per row
+        rows = np.asarray(rows, dtype=np.int64)
+        hit_rows, days = np.nonzero(model.mask(kind)[rows])
+        return np.split(days, np.searchsorted(hit_rows, np.arange(1, len(rows))))
+
+    def _build(self, model):
+        labels = np.asarray(model.days, dtype=object)
+        self.events = self._events(model, labels)
+        self.training = self._by_staff(model, labels, TRAINING)
+        self.free_days = self._by_staff(model, labels, FREE)
+        self.free_by_date = self._by_day(model, labels, FREE)
+
+    def _events(self, model, labels):
+        # Cells of every kind, then a single stable sort back into row-major order
+        staff_idx, day_idx, kind_idx = [], [], []
+        for k, kind in enumerate(self.kinds):
+            row_days = self._row_days[kind]
+            staff_idx.append(np.repeat(np.arange(len(row_days)), [len(days) for days in row_days]))
+            day_idx.append(np.concatenate(row_days) if row_days else np.zeros(0, dtype=np.int64))
+            kind_idx.append(np.full(len(staff_idx[-1]), k))
+        staff_idx = np.concatenate(staff_idx)
+        day_idx = np.concatenate(day_idx)
+        kind_idx = np.concatenate(kind_idx)
+        order = np.lexsort((kind_idx, day_idx, staff_idx))
+        return pd.DataFrame({
+            "Staff": model.staff[staff_idx[order]],
+            "Day": pd.Categorical(labels[day_idx[order]], categories=pd.unique(labels)),
+            "Kind": pd.Categorical.from_codes(kind_idx[order], [KIND_LABELS[k] for k in self.kinds]),
+        })
+
+    def _by_staff(self, model, labels, kind):
+        # Staff -> day labels, repeated names merged in first-seen order
+        grouped = {}
+        for name, days in zip(model.staff, self._row_days.get(kind, [])):
+            if len(days):
+                grouped.setdefault(name, []).extend(labels[days].tolist())
+        return self._frame(grouped, "Staff", "Days")
+
+    def _by_day(self, model, labels, kind):
+        # Day -> names, days in the order a row-major scan first meets them
+        grouped = {}
+        for name, days in zip(model.staff, self._row_days.get(kind, [])):
+            for day in labels[days].tolist():
+                grouped.setdefault(day, []).append(name)
+        return self._frame(grouped, "Day", "Staff")
+
+    @staticmethod
+    def _frame(grouped, by, as_name):
+        frame = pd.DataFrame({by: pd.Series(list(grouped), dtype=None if grouped else object),
+                              as_name: pd.Series(list(grouped.values()), dtype=object)})
+        frame["Count"] = np.array([len(items) for items in grouped.values()], dtype=np.int64)
+        return frame
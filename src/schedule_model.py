@@ -0,0 +1,283 @@
+import numpy as np
+import pandas as pd
+
+# Cell kinds, stored as uint8 bit flags so a cell can carry several (e.g. a yellow "0")
+FREE = 1        # value "0"
+TRAINING = 2    # "training" anywhere in the text
+DAY_OFF = 4     # painted with DAY_OFF_COLOR
+PROJECT = 8     # any other non-empty assignment
+
+KIND_LABELS = {FREE: "Free", TRAINING: "Training", DAY_OFF: "Day Off", PROJECT: "Project"}
+
+# Adjust this hex code to the exact COLOR used in your sheet for "Day Off"
+DAY_OFF_COLOR = "#ffff00"
+DEFAULT_COLOR = "#FFFFFF"
+DAYS_PER_WEEK = 7
+
+# Schedule window: the sheet's first date anchors column `anchor_col`, one column per day after it
+DATE_PATTERN = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
+DAY_LABEL_FORMAT = '%a %d/%m'
+STAFF_FIRST_ROW = 4        # row 5 of the sheet
+STAFF_NAME_COL = 1
+DEFAULT_WEEKS = 2
+HORIZON_WEEKS = (2, 4, 8, 13)
+
+
+def _intern(values, dtype):
+    """Factorizes a 2D object array into (codes of `dtype`, list of distinct labels)."""
+    values = np.asarray(values, dtype=object)
+    codes, labels = pd.factorize(values.ravel(), use_na_sentinel=False)
+    return codes.astype(dtype).reshape(values.shape), [str(label) for label in labels]
+
+
+def _extend(labels, values):
+    """Codes of `values` in `labels`, appending the ones not seen yet (labels is modified)."""
+    index = {label: code for code, label in enumerate(labels)}
+    return np.array([index.setdefault(str(value), len(index)) for value in values], dtype=np.int64), list(index)
+
+
+def _is_prefix(a, b):
+    """True when the shorter of two label lists starts the longer one."""
+    n = min(len(a), len(b))
+    return a[:n] == b[:n]
+
+
+def _code_dtype(n_labels):
+    for dtype in (np.uint8, np.uint16):
+        if n_labels <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint32
+
+
+def classify_label(label):
+    """Kind flag of one cell text: FREE ("0"), TRAINING, PROJECT (anything else) or 0 when empty."""
+    text = str(label).strip()
+    if text == "0":
+        return FREE
+    if "training" in text.lower():
+        return TRAINING
+    if text:
+        return PROJECT
+    return 0
+
+
+def find_anchor(df_v, max_rows=15, max_cols=10):
+    """(start date, column) of the first date found in the sheet's top-left corner, or (None, 0)."""
+    corner = df_v.iloc[:max_rows, :max_cols].astype(str)
+    # stack() is row-major, so the first match is the same cell a row-by-row scan would find
+    matches = corner.stack().str.extract(DATE_PATTERN)[0].dropna()
+    if matches.empty:
+        return None, 0
+    (_, col), text = next(matches.items())
+    return pd.to_datetime(text, dayfirst=True), int(col)
+
+
+class DateIndex:
+    """
+    Calendar date -> sheet column for every day the sheet covers, so any window
+    (start date + number of days) is a single reindex of this Series.
+    Days outside the sheet map to -1.
+    """
+
+    def __init__(self, anchor_date, anchor_col, n_cols):
+        dates = pd.date_range(pd.Timestamp(anchor_date).normalize(), periods=max(0, n_cols - anchor_col))
+        self.columns = pd.Series(np.arange(anchor_col, anchor_col + len(dates)), index=dates)
+
+    def window(self, start, n_days):
+        dates = pd.date_range(pd.Timestamp(start).normalize(), periods=n_days)
+        return dates, self.columns.reindex(dates, fill_value=-1).to_numpy()
+
+
+def build_window(df_v, df_c, start=None, weeks=DEFAULT_WEEKS):
+    """
+    Staff x day (values, colors) frames for `weeks` weeks from `start` (default: the sheet's first date).
+    Returns (df_val, df_col, error) with columns Staff + one "Mon 12/01" label per day;
+    days the sheet does not cover are blank / DEFAULT_COLOR.
+    """
+    anchor_date, anchor_col = find_anchor(df_v)
+    if anchor_date is None:
+        return None, None, "Could not find start date."
+
+    dates, cols = DateIndex(anchor_date, anchor_col, df_v.shape[1]).window(
+        anchor_date if start is None else start, weeks * DAYS_PER_WEEK)
+    work_days = ["Staff"] + list(dates.strftime(DAY_LABEL_FORMAT))
+
+    # 1. Staff rows: a non-empty name in the name column
+    names = df_v.iloc[STAFF_FIRST_ROW:, STAFF_NAME_COL].astype(str).str.strip()
+    rows = STAFF_FIRST_ROW + np.flatnonzero(((names != "") & (names.str.lower() != "none")).to_numpy())
+
+    # 2. One gather per grid, column -1 hits the appended blank/default column
+    def gather(df, fill):
+        grid = df.to_numpy(dtype=object)[rows]
+        grid = np.column_stack([grid, np.full(len(rows), fill, dtype=object)])
+        return grid[:, cols]
+
+    # Object columns: no per-column string inference here, and to_numpy() stays a view for the model
+    df_val = pd.DataFrame(np.column_stack([names.to_numpy(dtype=object)[rows - STAFF_FIRST_ROW],
+                                           gather(df_v, "")]), columns=work_days, dtype=object)
+    df_col = pd.DataFrame(np.column_stack([df_c.iloc[rows, STAFF_NAME_COL].to_numpy(dtype=object),
+                                           gather(df_c, DEFAULT_COLOR)]), columns=work_days, dtype=object)
+    return df_val, df_col, None
+
+
+class ScheduleModel:
+    """
+    Columnar staff x day schedule.
+
+    - staff:         names, shape (S,)
+    - days:          day labels ("Mon 12/01"), shape (D,)
+    - value_codes:   (S, D) codes into value_labels, one entry per distinct cell text
+    - color_codes:   (S, D) codes into palette, one entry per distinct hex color
+    - name_codes:    (S,) palette codes of the name column
+    - kinds:         (S, D) uint8 bit flags (FREE | TRAINING | DAY_OFF | PROJECT)
+
+    Text classification runs once per distinct label, not per cell, so every metric is a
+    handful of NumPy calls regardless of how many staff or days are loaded.
+    """
+
+    def __init__(self, staff, days, values, colors, name_colors):
+        self.staff = np.asarray(staff, dtype=object)
+        self.days = list(days)
+
+        values = np.array(values, dtype=object)
+        values[pd.isna(values)] = ""
+        value_codes, self.value_labels = _intern(values, np.int32)
+        self.value_codes = value_codes.astype(_code_dtype(len(self.value_labels)))
+
+        # Name colors share the palette so styling can index a single table
+        all_colors = np.column_stack([np.asarray(name_colors, dtype=object), np.asarray(colors, dtype=object)])
+        palette_codes, self.palette = _intern(all_colors, np.uint16)
+        dtype = _code_dtype(len(self.palette))
+        self.name_codes = palette_codes[:, 0].astype(dtype)
+        self.color_codes = palette_codes[:, 1:].astype(dtype)
+
+        self.kinds = self._classify()
+        for arr in (self.value_codes, self.color_codes, self.name_codes, self.kinds):
+            arr.flags.writeable = False
+
+    @classmethod
+    def from_frames(cls, df_val, df_col):
+        """Builds the model from rebuild_schedule's (values, colors) frames: Staff + day columns."""
+        return cls(
+            staff=df_val.iloc[:, 0].to_numpy(),
+            days=df_val.columns[1:],
+            values=df_val.iloc[:, 1:].to_numpy(dtype=object),
+            colors=df_col.iloc[:, 1:].to_numpy(dtype=object),
+            name_colors=df_col.iloc[:, 0].to_numpy(dtype=object),
+        )
+
+    def patched(self, df_val, df_col):
+        """
+        Model of an edited version of the same window (same staff, same days), or None when the
+        layout differs. Only the cells whose value or color changed are interned and classified;
+        codes of labels this model already has stay the same, so the two compare code by code.
+        """
+        staff = df_val.iloc[:, 0].to_numpy(dtype=object)
+        if list(df_val.columns[1:]) != self.days or not np.array_equal(staff, self.staff):
+            return None
+
+        values = df_val.iloc[:, 1:].to_numpy(dtype=object)
+        values = np.where(pd.isna(values), "", values)
+        colors = df_col.iloc[:, 1:].to_numpy(dtype=object)
+        name_colors = df_col.iloc[:, 0].to_numpy(dtype=object)
+        rows, cols = np.nonzero((values != self.values) | (colors != self.colors))
+        names = np.flatnonzero(name_colors != np.asarray(self.palette, dtype=object)[self.name_codes])
+        if not len(rows) and not len(names):
+            return self
+
+        # 1. Shared arrays are copied, only the edited cells get new codes
+        model = ScheduleModel.__new__(ScheduleModel)
+        model.staff, model.days = self.staff, self.days
+        value_codes, model.value_labels = _extend(self.value_labels, values[rows, cols])
+        color_codes, model.palette = _extend(self.palette, np.concatenate([colors[rows, cols], name_colors[names]]))
+        model.value_codes = self.value_codes.astype(_code_dtype(len(model.value_labels)))
+        model.value_codes[rows, cols] = value_codes
+        dtype = _code_dtype(len(model.palette))
+        model.color_codes, model.name_codes = self.color_codes.astype(dtype), self.name_codes.astype(dtype)
+        model.color_codes[rows, cols] = color_codes[:len(rows)]
+        model.name_codes[names] = color_codes[len(rows):]
+
+        # 2. Reclassify the edited cells only
+        model.kinds = self.kinds.copy()
+        model.kinds[rows, cols] = model._kinds_of(model.value_codes[rows, cols], model.color_codes[rows, cols])
+        for arr in (model.value_codes, model.color_codes, model.name_codes, model.kinds):
+            arr.flags.writeable = False
+        return model
+
+    def changed_cells(self, other):
+        """
+        (S, D) bool of the cells whose value or color differs from `other`, a model of the same
+        staff and days (None otherwise), plus (S,) bool of the rows whose name color differs.
+        """
+        if other.days != self.days or not np.array_equal(other.staff, self.staff):
+            return None, None
+        if _is_prefix(other.value_labels, self.value_labels) and _is_prefix(other.palette, self.palette):
+            # One model is patched from the other: compare codes, not strings
+            cells = (other.value_codes != self.value_codes) | (other.color_codes != self.color_codes)
+            names = other.name_codes != self.name_codes
+        else:
+            cells = (other.values != self.values) | (other.colors != self.colors)
+            names = (np.asarray(other.palette, dtype=object)[other.name_codes]
+                     != np.asarray(self.palette, dtype=object)[self.name_codes])
+        return cells, names
+
+    def _classify(self):
+        return self._kinds_of(self.value_codes, self.color_codes)
+
+    def _kinds_of(self, value_codes, color_codes):
+        # 1. One flag per distinct label in use
+        used, inverse = np.unique(value_codes, return_inverse=True)
+        label_kinds = np.array([classify_label(self.value_labels[code]) for code in used], dtype=np.uint8)
+
+        # 2. Broadcast to cells, then overlay the day-off color
+        kinds = label_kinds[inverse].reshape(np.shape(value_codes))
+        off_code = self.palette_code(DAY_OFF_COLOR)
+        if off_code is not None:
+            day_off = color_codes == off_code
+            kinds[day_off] = (kinds[day_off] | DAY_OFF) & ~np.uint8(PROJECT)
+        return kinds
+
+    # --- Lookups ---
+    def palette_code(self, color):
+        try:
+            return self.palette.index(color)
+        except ValueError:
+            return None
+
+    @property
+    def shape(self):
+        return self.value_codes.shape
+
+    @property
+    def values(self):
+        return np.asarray(self.value_labels, dtype=object)[self.value_codes]
+
+    @property
+    def colors(self):
+        return np.asarray(self.palette, dtype=object)[self.color_codes]
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.value_codes, self.color_codes, self.name_codes, self.kinds))
+
+    # --- Metrics ---
+    def mask(self, kind):
+        """(S, D) bool mask of cells carrying `kind`."""
+        return (self.kinds & kind) != 0
+
+    def count(self, kind, axis=1):
+        return self.mask(kind).sum(axis=axis)
+
+    def staff_with(self, kind):
+        """Names of staff having at least one `kind` day."""
+        return self.staff[self.mask(kind).any(axis=1)].tolist()
+
+    def weekly_counts(self, kind):
+        """(S, W) counts of `kind` per 7-day block, the last block zero padded."""
+        mask = self.mask(kind)
+        n_staff, n_days = mask.shape
+        n_weeks = max(1, -(-n_days // DAYS_PER_WEEK))
+        padded = np.zeros((n_staff, n_weeks * DAYS_PER_WEEK), dtype=bool)
+        padded[:, :n_days] = mask
+        return padded.reshape(n_staff, n_weeks, DAYS_PER_WEEK).sum(axis=2)
+
@@ -0,0 +1,30 @@
+import numpy as np
+
+# Text is always black on the sheet colors
+BASE_STYLE = "color: black; font-weight: 500;"
+
+
+def palette_css(palette):
+    """One CSS string per palette code, built once per distinct color instead of once per cell."""
+    return np.array([f"{BASE_STYLE} background-color: {color};" for color in palette], dtype=object)
+
+
+def cell_css(model):
+    """
+    (S, 1 + D) CSS matrix matching rebuild_schedule's frame (Staff + day columns),
+    gathered from the palette memo with a single fancy-index over the color codes.
+    """
+    codes = np.column_stack([model.name_codes, model.color_codes])
+    css = palette_css(model.palette)[codes]
+    css.flags.writeable = False
+    return css
+
+
+def patched_css(css, model, rows):
+    """cell_css of `model`, an edit of the model behind `css` (same staff and days) touching only `rows`."""
+    css = css.copy()
+    codes = np.column_stack([model.name_codes[rows], model.color_codes[rows]])
+    css[rows] = palette_css(model.palette)[codes]
+    css.flags.writeable = False
+    return css
+
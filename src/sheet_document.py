@@ -0,0 +1,127 @@
+import streamlit as st
+
+import sheet_parser
+import sheet_store
+from helper import content_hash
+
+
+class SheetDocument:
+    """
+    One parsed view of a published sheet (schedule or talent roster).
+
+    The HTML is walked exactly once. Every consumer (schedule grid, ProjectTracker,
+    project table, talent table) reads from the structures below instead of running its own pass:
+      - cells:       physical cells per <tr> as (text, css_class, colspan)
+      - values:      virtual value grid, colspans expanded
+      - classes:     css class per virtual cell (same shape as values)
+      - class_map:   css class -> background hex color from the <style> block
+      - row_offsets: index of the source <tr> for every grid row
+      - tokens:      stripped, upper-cased cell text -> grid rows containing it (see rows_with)
+    """
+
+    def __init__(self, html_content, backend=None):
+        self.content_hash = content_hash(html_content)
+        self.backend = backend or sheet_parser.default_backend()
+        self.class_map = {}
+        self.cells = []
+        self.values = []
+        self.classes = []
+        self.row_offsets = []
+        self.tokens = {}
+        self._parse(html_content)
+
+    @classmethod
+    def from_parts(cls, html_hash, backend, class_map, cells, row_offsets):
+        """Rebuilds a document from its physical cells (see sheet_store), without any HTML."""
+        doc = cls.__new__(cls)
+        doc.content_hash = html_hash
+        doc.backend = backend
+        doc.class_map = class_map
+        doc.cells, doc.values, doc.classes, doc.row_offsets = [], [], [], []
+        doc.tokens = {}
+        for tr_idx, physical in zip(row_offsets, cells):
+            doc._add_row(tr_idx, physical)
+        return doc
+
+    def _parse(self, html_content):
+        # 1. CSS class -> color
+        self.class_map = sheet_parser.parse_style_colors(html_content)
+
+        # 2. Physical cells + virtual grid in the same walk
+        for tr_idx, physical in enumerate(sheet_parser.iter_rows(html_content, self.backend)):
+            self._add_row(tr_idx, physical)
+
+    def _add_row(self, tr_idx, physical):
+        v_row, c_row = [], []
+        for text, cls, colspan in physical:
+            v_row.extend([text] * colspan)
+            c_row.extend([cls] * colspan)
+        if v_row:
+            g_idx = len(self.values)
+            for token in {text.strip().upper() for text in v_row if text}:
+                self.tokens.setdefault(token, []).append(g_idx)
+            self.cells.append(physical)
+            self.values.append(v_row)
+            self.classes.append(c_row)
+            self.row_offsets.append(tr_idx)
+
+    def color_grid(self, default="#FFFFFF"):
+        """Background colors for the virtual grid, unknown classes fall back to `default`."""
+        class_map = self.class_map
+        return [[class_map.get(cls, default) for cls in row] for row in self.classes]
+
+    def color_of(self, cls, default="#FFFFFF"):
+        return self.class_map.get(cls, default)
+
+    def cells_at(self, tr_idx):
+        """Physical cells of the <tr> at tr_idx ([] for rows without cells)."""
+        g_idx = self.first_grid_row(tr_idx)
+        if g_idx < len(self.row_offsets) and self.row_offsets[g_idx] == tr_idx:
+            return self.cells[g_idx]
+        return []
+
+    def rows_with(self, text):
+        """Grid rows having a cell equal to `text` (ignoring case and outer spaces), in order."""
+        return self.tokens.get(text.strip().upper(), [])
+
+    def sections(self, header_text):
+        """
+        Every table of the sheet whose column header row has a `header_text` cell ("Nr."),
+        as (title row, header row, body rows) where the title is the nearest row with text
+        above the header and the body runs up to the next table's title.
+        """
+        headers = self.rows_with(header_text)
+        titles = []
+        for i, header in enumerate(headers):
+            floor = headers[i - 1] if i else -1
+            title = next((g for g in range(header - 1, floor, -1) if any(self.values[g])), None)
+            titles.append(title)
+        ends = [title if title is not None else header for title, header in zip(titles[1:], headers[1:])]
+        ends.append(len(self.values))
+        return [(title, header, range(header + 1, end)) for title, header, end in zip(titles, headers, ends)]
+
+    def first_grid_row(self, tr_idx):
+        """First grid row whose source <tr> index is >= tr_idx."""
+        for g_idx, offset in enumerate(self.row_offsets):
+            if offset >= tr_idx:
+                return g_idx
+        return len(self.row_offsets)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_sheet_document(html_hash, _html_content):
+    # A restart reads the parsed document back from disk instead of parsing the HTML again
+    parts = sheet_store.load_parts(html_hash)
+    if parts is not None:
+        return SheetDocument.from_parts(html_hash, **parts)
+    doc = SheetDocument(_html_content)
+    sheet_store.save_parts(html_hash, doc.backend, doc.class_map, doc.cells, doc.row_offsets)
+    return doc
+
+
+def get_sheet_document(html_content):
+    """
+    Returns the shared SheetDocument for this HTML, parsing it only once per content hash
+    (and only once per machine thanks to the on-disk sheet_store).
+    """
+    return _load_sheet_document(content_hash(html_content), html_content)
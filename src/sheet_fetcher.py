@@ -0,0 +1,215 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from helper import content_hash
+
+MAX_AGE = 3600           # seconds a cached sheet is served without asking Google again
+TIMEOUT = (5, 30)        # (connect, read) seconds for one request
+POOL_SIZE = 8
+
+_session = None
+_session_lock = threading.Lock()
+
+# filename -> (mtime_ns, size, hash, content): the exact str object handed out last time,
+# so an unchanged sheet keeps hitting the same @st.cache_data entries.
+_contents = {}
+_contents_lock = threading.Lock()
+
+
+class FetchResult:
+    """Outcome of one fetch_sheet call."""
+
+    def __init__(self, url, filename, content, content_hash, status, elapsed, http_status=None, checked_at=None,
+                 error=None):
+        self.url = url
+        self.filename = filename
+        self.content = content
+        self.content_hash = content_hash
+        # "cached" | "not-modified" | "unchanged" | "updated" | "stale" | "error"
+        self.status = status
+        self.elapsed = elapsed
+        self.http_status = http_status
+        # when Google last confirmed this content (epoch seconds)
+        self.checked_at = checked_at if checked_at is not None else time.time()
+        self.error = error
+
+    @property
+    def changed(self):
+        return self.status == "updated"
+
+    @property
+    def ok(self):
+        return self.content is not None
+
+    def __repr__(self):
+        return f"FetchResult({self.filename!r}, status={self.status!r}, elapsed={self.elapsed:.3f}s)"
+
+
+def get_session():
+    """Process-wide pooled session (keep-alive + retry on transient Google errors)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                          allowed_methods=["GET"])
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def meta_path(filename):
+    """Validators + hash live next to the cache file, e.g. schedule_cache.html.meta.json"""
+    return f"{filename}.meta.json"
+
+
+def _read_meta(filename):
+    try:
+        with open(meta_path(filename), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, text):
+    # One temp file per writer, so two sessions refreshing at once never share it
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(path)),
+                                     prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False) as f:
+        f.write(text)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def _write_meta(filename, meta):
+    _write_atomic(meta_path(filename), json.dumps(meta, indent=2))
+
+
+def _read_cached(filename):
+    """Cached content for filename, reusing the in-memory object while the file is untouched."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None, None
+
+    with _contents_lock:
+        entry = _contents.get(filename)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[3], entry[2]
+
+    with open(filename, "r", encoding="utf-8") as f:
+        content = f.read()
+    digest = content_hash(content)
+    _remember(filename, content, digest)
+    return content, digest
+
+
+def _remember(filename, content, digest):
+    stat = os.stat(filename)
+    with _contents_lock:
+        _contents[filename] = (stat.st_mtime_ns, stat.st_size, digest, content)
+
+
+def fetch_sheet(url, filename, force_refresh=False, max_age=MAX_AGE, session=None, timeout=TIMEOUT):
+    """
+    Returns the published sheet at `url`, cached in `filename`.
+
+    - Younger than `max_age` (and not forced): served from disk, no request.
+    - Otherwise a conditional GET (If-None-Match / If-Modified-Since) is sent.
+      On 304, or on 200 with identical bytes, the cache file is left alone and the
+      previously returned content object is handed back.
+    - Network errors fall back to the cached copy when there is one.
+
+    `session` can be any requests.Session, e.g. one pointed at a local stand-in server.
+    """
+    start = time.perf_counter()
+    cached, cached_hash = _read_cached(filename)
+    meta = _read_meta(filename) if cached is not None else {}
+
+    checked_at = meta.get("checked_at", os.path.getmtime(filename)) if cached is not None else None
+    if cached is not None and not force_refresh and time.time() - checked_at <= max_age:
+        return FetchResult(url, filename, cached, cached_hash, "cached",
+                           time.perf_counter() - start, checked_at=checked_at)
+
+    headers = {}
+    if cached is not None and meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = (session or get_session()).get(url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException:
+        if cached is None:
+            raise
+        return FetchResult(url, filename, cached, cached_hash, "stale",
+                           time.perf_counter() - start, checked_at=checked_at)
+
+    # A 304 confirms the stored validators; a 200 replaces them, so new content never
+    # carries the ETag / Last-Modified of the old one
+    if response.status_code != 304:
+        meta.pop("etag", None)
+        meta.pop("last_modified", None)
+    meta.update({"url": url, "checked_at": time.time()})
+    meta.update({key: response.headers[header] for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+                 if response.headers.get(header)})
+
+    if response.status_code == 304:
+        meta["content_hash"] = cached_hash
+        _write_meta(filename, meta)
+        return FetchResult(url, filename, cached, cached_hash, "not-modified",
+                           time.perf_counter() - start, 304, meta["checked_at"])
+
+    content = response.text
+    digest = content_hash(content)
+    meta["content_hash"] = digest
+    if digest == cached_hash:
+        _write_meta(filename, meta)
+        return FetchResult(url, filename, cached, cached_hash, "unchanged",
+                           time.perf_counter() - start, response.status_code, meta["checked_at"])
+
+    _write_atomic(filename, content)
+    meta["updated_at"] = meta["checked_at"]
+    _write_meta(filename, meta)
+    _remember(filename, content, digest)
+    return FetchResult(url, filename, content, digest, "updated",
+                       time.perf_counter() - start, response.status_code, meta["checked_at"])
+
+
+def fetch_many(sources, max_workers=POOL_SIZE, **fetch_kwargs):
+    """
+    Fetches any number of sheets in parallel through fetch_sheet (same disk cache + validators).
+
+    `sources` is an iterable of (name, url, filename). Returns {name: FetchResult} in source
+    order; a sheet that fails without a cached copy comes back with status "error" instead of
+    failing the others.
+    """
+    sources = list(sources)
+    if not sources:
+        return {}
+
+    def fetch_one(source):
+        name, url, filename = source
+        start = time.perf_counter()
+        try:
+            return name, fetch_sheet(url, filename, **fetch_kwargs)
+        except Exception as e:
+            return name, FetchResult(url, filename, None, None, "error", time.perf_counter() - start, error=e)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sources)), thread_name_prefix="sheet-fetch") as pool:
+        return dict(pool.map(fetch_one, sources))
@@ -0,0 +1,140 @@
+import os
+import re
+from io import BytesIO
+
+# Google Sheets publishes one CSS class per cell format, e.g. .s12{...background-color:#ffff00;...}
+STYLE_COLOR_PATTERN = re.compile(r'\.(s\d+)\{[^}]*background-color:(#[a-fA-F0-9]{3,6})')
+STYLE_TAG_PATTERN = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+
+# Preferred order when no backend is requested explicitly
+BACKEND_ORDER = ["selectolax", "lxml", "bs4"]
+
+
+def parse_style_colors(html_content):
+    """CSS class -> background color from the first <style> block, read without building a DOM."""
+    match = STYLE_TAG_PATTERN.search(html_content)
+    if not match:
+        return {}
+    return {cls: color for cls, color in STYLE_COLOR_PATTERN.findall(match.group(1))}
+
+
+def _first_class(class_attr):
+    parts = class_attr.split() if class_attr else []
+    return parts[0] if parts else None
+
+
+def _colspan(value):
+    try:
+        return int(value or 1)
+    except ValueError:
+        return 1
+
+
+# --- Backends ---
+# Each backend yields one list of (text, css_class, colspan) per <tr> of the first <table>,
+# empty rows included so row indices stay identical across backends.
+
+def _rows_selectolax(html_content):
+    from selectolax.lexbor import LexborHTMLParser
+
+    table = LexborHTMLParser(html_content).css_first('table')
+    if table is None:
+        return
+    for tr in table.css('tr'):
+        row = []
+        for cell in tr.iter():
+            if cell.tag in ('td', 'th'):
+                row.append((
+                    cell.text(deep=True, separator='', strip=True),
+                    _first_class(cell.attributes.get('class')),
+                    _colspan(cell.attributes.get('colspan')),
+                ))
+        yield row
+
+
+def _rows_lxml(html_content):
+    from lxml import etree
+
+    source = BytesIO(html_content.encode('utf-8'))
+    tables_seen = 0
+    for event, el in etree.iterparse(source, events=('start', 'end'), tag=('table', 'tr'),
+                                     html=True, recover=True, encoding='utf-8'):
+        if el.tag == 'table':
+            if event == 'start':
+                tables_seen += 1
+            elif tables_seen == 1:
+                # Only the first table is published data, stop streaming after it
+                break
+            continue
+        if event != 'end' or tables_seen != 1:
+            continue
+
+        row = []
+        for cell in el:
+            if cell.tag in ('td', 'th'):
+                if len(cell):
+                    text = ''.join(s.strip() for s in cell.itertext())
+                else:
+                    # Plain text cell, the common case: skip the itertext walk
+                    text = cell.text.strip() if cell.text else ''
+                attrib = cell.attrib
+                row.append((text, _first_class(attrib.get('class')), _colspan(attrib.get('colspan'))))
+        yield row
+
+        # Free the parsed row so memory stays flat while streaming
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
+
+
+def _rows_bs4(html_content):
+    from bs4 import BeautifulSoup
+
+    table = BeautifulSoup(html_content, 'html.parser').find('table')
+    if not table:
+        return
+    for tr in table.find_all('tr'):
+        yield [
+            (cell.get_text(strip=True), cell.get('class', [None])[0], _colspan(cell.get('colspan')))
+            for cell in tr.find_all(['td', 'th'])
+        ]
+
+
+BACKENDS = {
+    "selectolax": ("selectolax.lexbor", _rows_selectolax),
+    "lxml": ("lxml.etree", _rows_lxml),
+    "bs4": ("bs4", _rows_bs4),
+}
+
+
+def available_backends():
+    """Backends whose library is importable here, in preference order."""
+    found = []
+    for name in BACKEND_ORDER:
+        module_name, _ = BACKENDS[name]
+        try:
+            __import__(module_name)
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+def default_backend():
+    """SHEET_PARSER_BACKEND env var if set and usable, otherwise the fastest installed backend."""
+    usable = available_backends()
+    requested = os.environ.get("SHEET_PARSER_BACKEND")
+    if requested in usable:
+        return requested
+    return usable[0] if usable else "bs4"
+
+
+def iter_rows(html_content, backend=None):
+    """
+    Streams the first table of a published sheet as rows of (text, css_class, colspan).
+    Text matches BeautifulSoup's get_text(strip=True), so every backend is interchangeable.
+    """
+    name = backend or default_backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{name}'. Use one of {list(BACKENDS)}.")
+    return BACKENDS[name][1](html_content)
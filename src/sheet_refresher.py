@@ -0,0 +1,110 @@
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+import sheet_fetcher
+from sheet_document import get_sheet_document
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two background revalidations of every sheet
+REFRESH_INTERVAL = int(os.environ.get("SHEET_REFRESH_INTERVAL", 900))
+
+
+class Snapshot:
+    """One fully parsed set of sheets; a refresh publishes a new Snapshot instead of mutating it."""
+
+    def __init__(self, results):
+        self.results = results                     # name -> FetchResult
+        self.contents = {name: r.content for name, r in results.items()}
+        self.hashes = {name: r.content_hash for name, r in results.items()}
+        self.documents = {name: get_sheet_document(r.content) for name, r in results.items()}
+        # Age is driven by the least recently confirmed sheet
+        self.checked_at = min((r.checked_at for r in results.values()), default=time.time())
+        self.created_at = time.time()
+
+    @property
+    def age(self):
+        """Seconds since Google last confirmed the oldest sheet of this snapshot."""
+        return max(0.0, time.time() - self.checked_at)
+
+    def age_label(self):
+        minutes = int(self.age // 60)
+        if minutes < 1:
+            return "just now"
+        if minutes < 60:
+            return f"{minutes} min ago"
+        return f"{minutes // 60} h {minutes % 60} min ago"
+
+
+class SheetRefresher:
+    """Ready Snapshot of every source sheet, revalidated by a daemon thread (latest() never waits on Google)."""
+
+    def __init__(self, sources, interval=REFRESH_INTERVAL):
+        self.sources = tuple(sources)               # (name, url, filename), any number of sheets
+        self.interval = interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.refreshing = False
+        self.last_error = None
+        self.last_timings = {}                      # name -> (status, seconds) of the last build
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sheet-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def latest(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    # Bootstrap from disk regardless of age, the worker revalidates it if too old
+                    self._snapshot = self._build(max_age=float("inf"))
+                snapshot = self._snapshot
+        if snapshot.age > self.interval and not self.refreshing:
+            self._wake.set()
+        return snapshot
+
+    def request_refresh(self):
+        """Asks the worker to revalidate every sheet now, without waiting for it."""
+        self.refreshing = True
+        self._wake.set()
+
+    def _build(self, max_age):
+        # All sheets in parallel, so a cold start costs the slowest round-trip, not the sum
+        results = sheet_fetcher.fetch_many(self.sources, max_age=max_age)
+        failed = {name: r.error for name, r in results.items() if not r.ok}
+        if failed:
+            raise RuntimeError(f"Could not fetch {', '.join(failed)}: {failed}")
+        self.last_timings = {name: (r.status, r.elapsed) for name, r in results.items()}
+        return Snapshot(results)
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.interval)
+            self._wake.clear()
+            self.refreshing = True
+            try:
+                # max_age=0: always revalidate, conditional requests keep this cheap
+                snapshot = self._build(max_age=0)
+                with self._lock:
+                    self._snapshot = snapshot
+                self.last_error = None
+            except Exception as e:  # keep serving the previous snapshot
+                self.last_error = e
+                logger.warning("Sheet refresh failed: %s", e)
+            finally:
+                self.refreshing = False
+
+
+@st.cache_resource(show_spinner=False)
+def get_refresher(sources, interval=REFRESH_INTERVAL):
+    """Process-wide SheetRefresher over a tuple of (name, url, filename) sources."""
+    return SheetRefresher(sources, interval).start()
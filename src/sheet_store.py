@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Parsed sheets survive restarts here, one directory per HTML content hash (next to this module,
+# whatever directory streamlit was started from)
+STORE_DIR = os.environ.get("SHEET_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sheet_store"))
+STORE_VERSION = 1
+MAX_ENTRIES = 8
+
+ARRAYS = ("text_codes", "class_codes", "colspans", "row_lengths", "row_offsets")
+
+
+def entry_path(html_hash, store_dir=None):
+    return os.path.join(store_dir or STORE_DIR, html_hash)
+
+
+def save_parts(html_hash, backend, class_map, cells, row_offsets, store_dir=None):
+    """
+    Writes a parsed sheet as flat NumPy arrays + a small JSON header:
+      - text_codes / class_codes / colspans: one entry per physical cell, row after row
+      - row_lengths: number of cells of every grid row, row_offsets: its source <tr>
+      - meta.json:   distinct texts and classes, class -> color map, parser backend
+    The entry is written to a temp directory and renamed, so readers never see half of it.
+    """
+    path = entry_path(html_hash, store_dir)
+    if os.path.isdir(path):
+        return path
+
+    flat = [cell for row in cells for cell in row]
+    texts, classes = {}, {}
+    text_codes = np.fromiter((texts.setdefault(t, len(texts)) for t, _, _ in flat), dtype=np.int32, count=len(flat))
+    class_codes = np.fromiter((classes.setdefault(c, len(classes)) for _, c, _ in flat), dtype=np.int32,
+                              count=len(flat))
+    arrays = {
+        "text_codes": text_codes,
+        "class_codes": class_codes,
+        "colspans": np.fromiter((span for _, _, span in flat), dtype=np.int32, count=len(flat)),
+        "row_lengths": np.array([len(row) for row in cells], dtype=np.int32),
+        "row_offsets": np.array(row_offsets, dtype=np.int32),
+    }
+    meta = {
+        "version": STORE_VERSION,
+        "backend": backend,
+        "class_map": class_map,
+        "texts": list(texts),
+        "classes": list(classes),
+    }
+
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_path)
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), arr)
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:  # another process stored the same hash first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        _prune(store_dir or STORE_DIR)
+    except OSError as e:  # a read-only disk only costs the next cold start
+        logger.warning("Could not store parsed sheet %s: %s", html_hash, e)
+    return path
+
+
+def load_parts(html_hash, store_dir=None):
+    """
+    The stored parts of a parsed sheet (kwargs of SheetDocument.from_parts), or None.
+    from_parts rebuilds every row, so the arrays are read whole rather than memory-mapped.
+    """
+    path = entry_path(html_hash, store_dir)
+    try:
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            return None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy")) for name in ARRAYS}
+    except (OSError, ValueError):
+        return None
+
+    # One gather per column of the cell table, then split back into rows
+    texts = np.array(meta["texts"], dtype=object)[arrays["text_codes"]]
+    classes = np.array(meta["classes"], dtype=object)[arrays["class_codes"]]
+    flat = list(zip(texts.tolist(), classes.tolist(), arrays["colspans"].tolist()))
+    ends = np.cumsum(arrays["row_lengths"]).tolist()
+    cells = [flat[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+    try:
+        os.utime(path)  # keeps recently used entries out of _prune
+    except OSError:  # read-only store: the entry just ages like any other
+        pass
+    return {
+        "backend": meta["backend"],
+        "class_map": meta["class_map"],
+        "cells": cells,
+        "row_offsets": arrays["row_offsets"].tolist(),
+    }
+
+
+def _prune(store_dir, keep=MAX_ENTRIES):
+    """Drops all but the `keep` most recently used entries."""
+    entries = [os.path.join(store_dir, name) for name in os.listdir(store_dir) if not name.endswith(".tmp")]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_registry
+from helper import name_key
+from schedule_model import FREE
+from talent_matrix import MASTERY_LEVELS, MASTERY_SCORES
+
+# The talent sheet ends with a per-skill totals row, never a search result
+SUMMARY_ROW_PREFIX = "Total"
+
+
+def level_score(level):
+    """'5', '5.1', 'M', 'W' or a number -> canonical score (see talent_matrix)."""
+    if isinstance(level, str):
+        return MASTERY_SCORES[level.strip().upper()]
+    return float(level)
+
+
+class SkillIndex:
+    """
+    Inverted index over a TalentMatrix: (skill, minimum level) -> packed staff bitset.
+
+    bits[j, L] has bit i set when staff i has at least level L (canonical score) in skill j,
+    so "Revit >= 5 and IFC Viewer >= M" is a bitwise AND of two precomputed rows.
+    """
+
+    def __init__(self, talent):
+        self.talent = talent
+        self.n_staff = len(talent.staff)
+        levels = talent.scores.astype(np.uint8)                           # (S, K)
+        thresholds = np.arange(len(MASTERY_LEVELS) + 1, dtype=np.uint8)  # 0..8
+        at_least = levels.T[:, None, :] >= thresholds[None, :, None]    # (K, 9, S)
+        self.bits = np.packbits(at_least, axis=2)
+        self.bits.flags.writeable = False
+
+        searchable = ~pd.Series(talent.staff, dtype=object).astype(str).str.startswith(SUMMARY_ROW_PREFIX)
+        self.searchable = np.packbits(searchable.to_numpy())
+        self._name_keys = [name_key(name) for name in talent.staff]
+
+    def _unpack(self, bits):
+        return np.unpackbits(bits, count=self.n_staff).astype(bool)
+
+    def match(self, terms):
+        """Bool mask over talent.staff of the staff meeting every (skill, minimum level) term."""
+        bits = self.searchable.copy()
+        for skill, level in terms:
+            j = self.talent.skill_index([skill])
+            if not len(j):
+                return np.zeros(self.n_staff, dtype=bool)
+            bits &= self.bits[j[0], int(level_score(level))]
+        return self._unpack(bits)
+
+    def free_mask(self, model):
+        """(S, D) free ("0") days of the schedule window per talent staff member, matched by name (all False when unknown)."""
+        rows = pd.Index([name_key(name) for name in model.staff]).get_indexer(self._name_keys)
+        free = model.mask(FREE)[rows]
+        free[rows < 0] = False
+        return free
+
+    def free_days(self, model, day_slice=slice(None)):
+        """Free days per talent staff member in a slice of the schedule window (0 when unknown)."""
+        return self.free_mask(model)[:, day_slice].sum(axis=1)
+
+    def search(self, terms, free_days=None, min_free_days=0, rank_skills=None, limit=None):
+        """
+        Staff matching every term, optionally with at least `min_free_days` free days
+        (`free_days` aligned with talent.staff), ranked by their summed scores over
+        `rank_skills` (default: the searched skills, or every skill without terms).
+        """
+        mask = self.match(terms)
+        if free_days is not None and min_free_days > 0:
+            mask &= free_days >= min_free_days
+
+        rows = np.flatnonzero(mask)
+        if rank_skills is None:
+            rank_skills = [skill for skill, _ in terms] or self.talent.skills
+        rank_idx = self.talent.skill_index(rank_skills)
+        mastery = self.talent.scores[np.ix_(rows, rank_idx)].sum(axis=1)
+        order = np.lexsort((rows, -mastery))[:limit]
+
+        result = pd.DataFrame({"Staff": self.talent.staff[rows[order]], "Mastery": mastery[order]})
+        for skill, _ in terms:
+            j = self.talent.skill_index([skill])[0]
+            result[skill] = self.talent.labels[rows[order], j]
+        if free_days is not None:
+            result["Free days"] = free_days[rows[order]]
+        return result
+
+
+@cache_registry.depends_on("talent")
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_skill_index(talent_hash, _talent):
+    """SkillIndex built once per talent sheet content hash."""
+    return SkillIndex(_talent)
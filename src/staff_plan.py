@@ -0,0 +1,234 @@
+import glob
+import logging
+import os
+import re
+import uuid
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from helper import content_hash
+from schedule_model import DAY_OFF, DAYS_PER_WEEK, KIND_LABELS, PROJECT, TRAINING, classify_label
+
+logger = logging.getLogger(__name__)
+
+# Next to this module, wherever the app is started from
+PLAN_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Mitarbeiterplanung.csv")
+# The plan has no cell colors, days off are written out
+DAY_OFF_LABEL = "day off"
+UTILIZATION_KINDS = (DAY_OFF, TRAINING, PROJECT)
+HEADER_DATE_PATTERN = re.compile(r"^\d{2}/\d{2}/\d{2}$")
+HEADER_DATE_FORMAT = "%d/%m/%y"
+# Checkbox cells of the sheet, not assignments
+CHECKBOX_LABELS = ("TRUE", "FALSE")
+# Version of the parse_plan_csv output, part of the Parquet copy's name
+PLAN_FORMAT = 2
+
+
+def parse_plan_csv(text):
+    """
+    Unpivots the yearly weekly plan (one row per staff, one 7-column block per week,
+    the block's Monday date in the header and `Unnamed: N` fillers for the other days)
+    into a long table with one row per assigned day. A person's Monday cell is the
+    assignment of the whole week, the other days only hold overrides ("day off", ...):
+
+        Staff (category) | Date (datetime64) | Assignment (category)
+
+    sorted by staff (sheet order) then date.
+    """
+    wide = pd.read_csv(StringIO(text), index_col=0, dtype=str)
+    header = pd.Series(wide.columns[1:])
+
+    # 1. Forward-fill the week blocks: every column gets its block's Monday + its offset in the block
+    is_monday = header.str.match(HEADER_DATE_PATTERN)
+    block = is_monday.cumsum().to_numpy() - 1
+    mondays = pd.to_datetime(header[is_monday], format=HEADER_DATE_FORMAT).to_numpy()
+    offset = np.arange(len(header)) - np.flatnonzero(is_monday.to_numpy())[block]
+    col_dates = mondays[block] + offset.astype("timedelta64[D]")
+
+    # A block only owns the days up to the next block's Monday (a stray 8th column is dropped)
+    next_monday = np.append(mondays[1:], np.datetime64("NaT"))[block]
+    in_block = (block >= 0) & (np.isnat(next_monday) | (col_dates < next_monday))
+
+    # 2. Staff rows: a name, minus the "Mitarbeiter" title row
+    names = wide.iloc[:, 0].str.strip()
+    is_staff = (names.notna() & (names != "") & (names != "Mitarbeiter")).to_numpy()
+
+    # 3. Clean cells, checkboxes count as empty
+    grid = wide.iloc[:, 1:].to_numpy(dtype=object)[is_staff]
+    grid = np.char.strip(np.where(pd.isna(grid), "", grid).astype(str))
+    grid[np.isin(grid, CHECKBOX_LABELS)] = ""
+
+    # 4. Every empty day takes the Monday cell of its week (a block missing the next
+    #    header runs on for more than 7 columns, each week with its own Monday)
+    block_start = np.flatnonzero(is_monday.to_numpy())[np.maximum(block, 0)]
+    monday_col = block_start + offset - offset % DAYS_PER_WEEK
+    grid = np.where(grid != "", grid, grid[:, monday_col])[:, in_block]
+
+    # 5. Unpivot in one nonzero() over the (staff, day) grid, row-major = staff then date
+    rows, cols = np.nonzero(grid != "")
+
+    staff = names[is_staff].to_numpy(dtype=object)
+    long = pd.DataFrame({
+        "Staff": pd.Categorical(staff[rows], categories=pd.unique(staff)),
+        "Date": col_dates[in_block][cols],
+        "Assignment": pd.Categorical(grid[rows, cols]),
+    })
+    # Weeks are not always consecutive columns, sort dates inside each staff
+    return long.sort_values(["Staff", "Date"], kind="stable", ignore_index=True)
+
+
+def load_plan(path=PLAN_CSV, text=None):
+    """
+    Long plan table for `path`, read from a Parquet copy keyed by the CSV's content hash
+    (and PLAN_FORMAT) so the wide CSV is only unpivoted once per version of the file.
+    """
+    if text is None:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    parquet_path = f"{path}.{content_hash(text)[:12]}.v{PLAN_FORMAT}.parquet"
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path)
+
+    long = parse_plan_csv(text)
+    try:
+        tmp_path = f"{parquet_path}.{uuid.uuid4().hex}.tmp"
+        long.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+        _prune_copies(path, keep=parquet_path)
+    except OSError as e:  # a read-only disk only costs the next unpivot
+        logger.warning("Could not store the staff plan copy %s: %s", parquet_path, e)
+    return long
+
+
+def _prune_copies(path, keep):
+    """Deletes the Parquet copies of older versions of the CSV at `path`."""
+    for old in glob.glob(f"{glob.escape(path)}.*.parquet"):
+        if old != keep:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def _group_offsets(codes, n_groups):
+    """(order, offsets): rows of group g are order[offsets[g]:offsets[g + 1]]."""
+    order = np.argsort(codes, kind="stable")
+    return order, np.searchsorted(codes[order], np.arange(n_groups + 1))
+
+
+class StaffPlan:
+    """
+    Indexed view of the long plan table.
+
+    - staff_range(staff, start, end): one person's assignments over a date range
+    - on_date(date):                  everyone's assignment on one day
+    - occurrences(assignment):        every (staff, date) carrying an assignment,
+                                      matched case-insensitively ("day off" == "Day Off")
+
+    Each query is a couple of searchsorted() calls into precomputed sort orders.
+    weekly_utilization() aggregates the whole table into small staff x week matrices once.
+    """
+
+    def __init__(self, long):
+        self.df = long
+        self.staff = list(long["Staff"].cat.categories)
+        self._staff_pos = {name: i for i, name in enumerate(self.staff)}
+        self._dates = long["Date"].to_numpy()
+
+        # 1. Staff -> row range (the table is sorted by staff, then date)
+        staff_codes = long["Staff"].cat.codes.to_numpy()
+        self._staff_offsets = np.searchsorted(staff_codes, np.arange(len(self.staff) + 1))
+
+        # 2. Date -> rows
+        self._date_order = np.argsort(self._dates, kind="stable")
+        self._sorted_dates = self._dates[self._date_order]
+
+        # 3. Normalized assignment -> rows
+        labels = pd.Index(long["Assignment"].cat.categories).str.strip().str.lower()
+        key_of_label, self._keys = pd.factorize(labels)
+        key_codes = key_of_label[long["Assignment"].cat.codes.to_numpy()]
+        self._key_pos = {key: i for i, key in enumerate(self._keys)}
+        self._key_order, self._key_offsets = _group_offsets(key_codes, len(self._keys))
+
+        # 4. Kind flag per row, classified once per distinct label (checkboxes are no kind at all)
+        checkboxes = {label.lower() for label in CHECKBOX_LABELS}
+        label_kinds = np.array([DAY_OFF if key == DAY_OFF_LABEL else 0 if key in checkboxes else classify_label(key)
+                                for key in self._keys], dtype=np.uint8)
+        self.kinds = label_kinds[key_codes]
+        self._utilization = None
+
+    def staff_range(self, staff, start=None, end=None):
+        """Rows of `staff` with start <= Date <= end (either bound optional)."""
+        pos = self._staff_pos.get(staff)
+        if pos is None:
+            return self.df.iloc[:0]
+        lo, hi = self._staff_offsets[pos], self._staff_offsets[pos + 1]
+        dates = self._dates[lo:hi]
+        if start is not None:
+            lo += np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left")
+        if end is not None:
+            hi = self._staff_offsets[pos] + np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right")
+        return self.df.iloc[lo:hi]
+
+    def on_date(self, date):
+        """Everyone's assignment on `date`, in staff order."""
+        day = np.datetime64(pd.Timestamp(date).normalize())
+        lo = np.searchsorted(self._sorted_dates, day, side="left")
+        hi = np.searchsorted(self._sorted_dates, day, side="right")
+        return self.df.iloc[self._date_order[lo:hi]]
+
+    def occurrences(self, assignment):
+        """Every row whose assignment equals `assignment`, ignoring case and outer spaces."""
+        pos = self._key_pos.get(str(assignment).strip().lower())
+        if pos is None:
+            return self.df.iloc[:0]
+        return self.df.iloc[self._key_order[self._key_offsets[pos]:self._key_offsets[pos + 1]]]
+
+    def weekly_utilization(self, start=None, end=None):
+        """
+        (weeks, {kind label: (S, W) float32 share of the week's days}) for the Monday-based
+        weeks between `start` and `end`. The full-range matrices are built once with one
+        bincount per kind; a date range is a column slice of them.
+        """
+        if self._utilization is None:
+            self._utilization = self._aggregate_weeks()
+        weeks, shares = self._utilization
+        lo = 0 if start is None else weeks.searchsorted(pd.Timestamp(start) - pd.Timedelta(days=DAYS_PER_WEEK - 1))
+        hi = len(weeks) if end is None else weeks.searchsorted(pd.Timestamp(end), side="right")
+        return weeks[lo:hi], {label: share[:, lo:hi] for label, share in shares.items()}
+
+    def _aggregate_weeks(self):
+        if not len(self._dates):
+            return pd.DatetimeIndex([]), {KIND_LABELS[k]: np.zeros((len(self.staff), 0), np.float32)
+                                          for k in UTILIZATION_KINDS}
+        dates = pd.DatetimeIndex(self._dates)
+        mondays = dates.normalize() - pd.to_timedelta(dates.weekday, unit="D")
+        first = mondays.min()
+        weeks = pd.date_range(first, mondays.max(), freq="7D")
+        week_idx = ((mondays - first).days // DAYS_PER_WEEK).to_numpy()
+        cell = self.df["Staff"].cat.codes.to_numpy().astype(np.int64) * len(weeks) + week_idx
+
+        shape = (len(self.staff), len(weeks))
+        shares = {}
+        for kind in UTILIZATION_KINDS:
+            counts = np.bincount(cell, weights=(self.kinds & kind) != 0, minlength=shape[0] * shape[1])
+            shares[KIND_LABELS[kind]] = (counts.reshape(shape) / DAYS_PER_WEEK).astype(np.float32)
+        return weeks, shares
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_staff_plan(plan_hash, _path, _text):
+    return StaffPlan(load_plan(_path, _text))
+
+
+def get_staff_plan(path=PLAN_CSV):
+    """Shared StaffPlan for the CSV at `path`, rebuilt only when its content changes (None without a CSV)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+    return _load_staff_plan(content_hash(text), path, text)
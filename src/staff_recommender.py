@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from talent_matrix import MAX_SCORE
+
+# Share of the score coming from skill fit, the rest is availability
+SKILL_WEIGHT = 0.7
+DEFAULT_TOP_K = 5
+# 'to Bali' / 'to Swiss' cells of the project tracker
+PROJECT_DATE_FORMAT = "%d.%m.%y"
+
+
+def project_days(projects, dates):
+    """
+    (P, D) bool: the window days each project runs, from its 'to Bali' date to its
+    'to Swiss' deadline. A missing date leaves that side of the window open.
+    """
+    days = np.asarray(pd.DatetimeIndex(dates).normalize(), dtype="datetime64[D]")
+    start = pd.to_datetime(projects["to Bali"].str.strip(), format=PROJECT_DATE_FORMAT, errors="coerce")
+    end = pd.to_datetime(projects["to Swiss"].str.strip(), format=PROJECT_DATE_FORMAT, errors="coerce")
+    # Cast first, then open the missing sides onto the window (NaT compares False either way)
+    start, end = np.asarray(start, dtype="datetime64[D]"), np.asarray(end, dtype="datetime64[D]")
+    if len(days):
+        start = np.where(np.isnat(start), days[0], start)
+        end = np.where(np.isnat(end), days[-1], end)
+    return (days[None, :] >= start[:, None]) & (days[None, :] <= end[:, None])
+
+
+class StaffRecommender:
+    """
+    Ranks staff for projects by skill fit and free days in the schedule window.
+
+    - profile(categories):         (K,) skill weights of a TALENT_GROUPS category profile
+    - score(profiles, day_masks):  (S, P) fit, free days and combined score of every staff
+                                   member for every project, as two matrix products
+    - recommend(...):              top-k staff per project as a tidy frame
+
+    Skill fit is the profile-weighted mean score over MAX_SCORE; availability is the share
+    of a project's window days the person is free ("0" in the schedule).
+    """
+
+    def __init__(self, talent, skill_index, model, groups, skill_weight=SKILL_WEIGHT):
+        self.talent = talent
+        self.groups = groups
+        self.skill_weight = skill_weight
+        self.free = skill_index.free_mask(model).astype(np.float32)  # (S, D), aligned with talent.staff
+        self.candidates = skill_index.match([])                       # every staff row but the totals
+
+    def profile(self, categories):
+        """
+        (K,) weights over talent.skills. `categories` is a list of TALENT_GROUPS names or a
+        {name: weight} dict; a category's weight is shared by its skills.
+        """
+        if not isinstance(categories, dict):
+            categories = dict.fromkeys(categories, 1.0)
+        weights = np.zeros(len(self.talent.skills), dtype=np.float32)
+        for category, weight in categories.items():
+            idx = self.talent.skill_index(self.groups.get(category, []))
+            if len(idx):
+                weights[idx] += weight / len(idx)
+        total = weights.sum()
+        return weights / total if total else weights
+
+    def score(self, profiles, day_masks):
+        """(fit, free_days, score), each (S, P), for (P, K) profiles and (P, D) project day masks."""
+        profiles = np.atleast_2d(np.asarray(profiles, dtype=np.float32))
+        day_masks = np.atleast_2d(np.asarray(day_masks, dtype=np.float32))
+        fit = self.talent.scores @ profiles.T / MAX_SCORE
+        free_days = self.free @ day_masks.T
+        availability = free_days / np.maximum(day_masks.sum(axis=1), 1.0)
+        score = self.skill_weight * fit + (1 - self.skill_weight) * availability
+        score[~self.candidates] = -np.inf
+        return fit, free_days, score
+
+    def recommend(self, projects, profiles, dates, k=DEFAULT_TOP_K):
+        """
+        Top-`k` staff per row of `projects` (an all_projects_df slice), one (K,) profile per row
+        (or one shared by all), over the schedule window `dates`:
+
+            Projekt | Rank | Staff | Score | Skill fit | Free days
+        """
+        profiles = np.atleast_2d(profiles)
+        if len(profiles) == 1:
+            profiles = np.repeat(profiles, len(projects), axis=0)
+        fit, free_days, score = self.score(profiles, project_days(projects, dates))
+
+        # 1. argpartition picks the k best of every column, argsort only orders those k
+        k = min(k, int(self.candidates.sum()))
+        if k <= 0 or not len(projects):
+            return pd.DataFrame(columns=["Projekt", "Rank", "Staff", "Score", "Skill fit", "Free days"])
+        top = np.argpartition(-score, k - 1, axis=0)[:k]            # (k, P)
+        cols = np.arange(score.shape[1])
+        top = np.take_along_axis(top, np.argsort(-score[top, cols], axis=0, kind="stable"), axis=0)
+
+        # 2. Flatten project by project
+        rows, cols = top.T.ravel(), np.repeat(cols, k)
+        return pd.DataFrame({
+            "Projekt": projects["Projekt"].to_numpy(dtype=object)[cols],
+            "Rank": np.tile(np.arange(1, k + 1), len(projects)),
+            "Staff": self.talent.staff[rows],
+            "Score": score[rows, cols].round(3),
+            "Skill fit": fit[rows, cols].round(3),
+            "Free days": free_days[rows, cols].astype(int),
+        })
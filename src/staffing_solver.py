@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.optimize import linear_sum_assignment
+
+import cache_registry
+from staff_recommender import project_days
+
+# ProjectTracker categories that still need people
+OPEN_CATEGORIES = ("ON PROGRESS", "AUFTRAG")
+HOURS_PER_DAY = 8
+
+
+def demand_days(projects):
+    """Person-days each project still needs: its 'Time' ("120 hr") over HOURS_PER_DAY, rounded up."""
+    hours = pd.to_numeric(projects["Time"].str.extract(r"(\d+(?:\.\d+)?)", expand=False), errors="coerce")
+    return np.ceil(hours.fillna(0).to_numpy(dtype=np.float64) / HOURS_PER_DAY).astype(np.int64)
+
+
+def solve(fit, free, day_masks, demand):
+    """
+    (S, P) person-days of every staff member on every project, maximizing the summed skill fit.
+
+    - fit:       (S, P) skill fit, only pairs with fit > 0 are ever staffed
+    - free:      (S, D) bool free days of the window (the per-person capacity)
+    - day_masks: (P, D) bool days each project runs
+    - demand:    (P,) person-days each project needs
+
+    Capacities are expanded into unit slots so the Hungarian algorithm applies: one row per
+    free (staff, day) cell, one column per needed project day. A row can only take a column
+    whose project runs on that day, so nobody is booked twice on the same day. Every other
+    pair gains 0 and is left unmatched, which keeps the matching a true optimum.
+    """
+    free, day_masks = np.asarray(free, dtype=bool), np.asarray(day_masks, dtype=bool)
+    n_staff, n_projects = fit.shape
+    days = np.zeros((n_staff, n_projects), dtype=np.int64)
+
+    # 1. Supply slots: free cells. Demand slots: never more than the free person-days in the project window
+    slot_staff, slot_day = np.nonzero(free)
+    available = free.sum(axis=0) @ day_masks.T.astype(np.int64)
+    slot_project = np.repeat(np.arange(n_projects), np.minimum(demand, available))
+    if not len(slot_staff) or not len(slot_project):
+        return days
+
+    # 2. Slot x slot gain, 0 where the project does not run on the slot's day. Zero-gain pairs
+    #    are dropped below, so they act as "leave unmatched" and never cost the optimum anything
+    runs = day_masks[np.ix_(slot_project, slot_day)].T
+    gain = np.where(runs, np.maximum(fit[np.ix_(slot_staff, slot_project)], 0.0), 0.0)
+
+    # 3. Solve, then fold the matched (positive gain) slots back into (staff, project) day counts
+    rows, cols = linear_sum_assignment(gain, maximize=True)
+    kept = gain[rows, cols] > 0
+    np.add.at(days, (slot_staff[rows[kept]], slot_project[cols[kept]]), 1)
+    return days
+
+
+class StaffingPlan:
+    """
+    One optimal assignment of staff to every open project of the tracker.
+
+    - assignments: Projekt, Staff, Days, Skill fit (one row per staffed pair)
+    - coverage:    Category, Projekt, Needed days, Staffed days, Staff
+    - total_fit:   the maximized sum of skill fit over the staffed person-days
+    """
+
+    def __init__(self, recommender, projects, profiles, dates):
+        profiles = np.atleast_2d(profiles)
+        if len(profiles) == 1:
+            profiles = np.repeat(profiles, len(projects), axis=0)
+        day_masks = project_days(projects, dates)
+        fit, _, _ = recommender.score(profiles, day_masks)
+        fit[~recommender.candidates] = 0
+        demand = demand_days(projects)
+        self.days = solve(fit, recommender.free, day_masks, demand)
+        self.total_fit = float((self.days * fit).sum())
+
+        # Project by project, most days first
+        project, staff = np.nonzero(self.days.T)
+        order = np.lexsort((-self.days[staff, project], project))
+        staff, project = staff[order], project[order]
+        names = projects["Projekt"].to_numpy(dtype=object)
+        self.assignments = pd.DataFrame({
+            "Projekt": names[project],
+            "Staff": recommender.talent.staff[staff],
+            "Days": self.days[staff, project],
+            "Skill fit": fit[staff, project].round(3),
+        })
+        staffed = pd.Series(self.assignments["Staff"].to_numpy(), index=project).groupby(level=0).agg(", ".join)
+        self.coverage = pd.DataFrame({
+            "Category": projects["Category"].to_numpy(dtype=object),
+            "Projekt": names,
+            "Needed days": demand,
+            "Staffed days": self.days.sum(axis=0),
+            "Staff": staffed.reindex(np.arange(len(projects)), fill_value="").to_numpy(dtype=object),
+        })
+
+
+@cache_registry.depends_on("schedule", "talent")
+@st.cache_data(show_spinner="Solving staffing plan...", max_entries=8)
+def get_staffing_plan(schedule_key, talent_hash, categories, _recommender, _projects, _profiles, _dates):
+    """One StaffingPlan per schedule window, talent sheet and required skill categories."""
+    return StaffingPlan(_recommender, _projects, _profiles, _dates)
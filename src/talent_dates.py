@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_registry
+
+# df_talent 'Date' cells (first working day), e.g. "05.02.16"
+DATE_FORMAT = "%d.%m.%y"
+
+
+def parse_dates(texts):
+    """Whole column of 'DD.MM.YY' strings -> DatetimeIndex, NaT where empty or invalid."""
+    return pd.DatetimeIndex(pd.to_datetime(pd.Series(texts, dtype=object).astype(str).str.strip(),
+                                           format=DATE_FORMAT, errors="coerce"))
+
+
+def human_dates(dates, texts):
+    """'February 5th, 2016' per date; like helper.to_human_date, unparsable cells keep their text."""
+    days = dates.day.to_numpy(dtype=np.float64)
+    suffix = np.select([(days % 100 >= 11) & (days % 100 <= 13), days % 10 == 1, days % 10 == 2, days % 10 == 3],
+                       ["th", "st", "nd", "rd"], "th")
+    labels = (dates.strftime("%B ").astype(object) + pd.Index(days).astype("Int64").astype(str).astype(object)
+              + suffix.astype(object) + dates.strftime(", %Y").astype(object))
+    return np.where(dates.isna(), np.asarray(texts, dtype=object), np.asarray(labels, dtype=object))
+
+
+def tenure_parts(dates, today):
+    """
+    (years, months, days) int arrays from every date to `today`, the same calendar arithmetic
+    as relativedelta(today, date): whole months first, day of month clipped to the month end.
+    Missing and future dates give zeros.
+    """
+    today = pd.Timestamp(today).normalize()
+    valid = dates.notna() & (dates <= today)
+    start = dates.where(valid, today)
+
+    # Months since 1970-01, the unit of datetime64[M]
+    start_month = start.to_numpy().astype("datetime64[M]").astype(np.int64)
+    months = np.datetime64(today, "M").astype(np.int64) - start_month
+
+    def anchor(n_months):
+        # start + n_months, with the start's day clipped to the length of the target month
+        first = (start_month + n_months).astype("datetime64[M]")
+        month_len = ((first + 1).astype("datetime64[D]") - first.astype("datetime64[D]")).astype(np.int64)
+        return first.astype("datetime64[D]") + np.minimum(start.day.to_numpy(), month_len) - 1
+
+    today_day = np.datetime64(today.date(), "D")
+    overshoot = anchor(months) > today_day
+    months = months - overshoot
+    days = (today_day - anchor(months)).astype(np.int64)
+    return months // 12, months % 12, days
+
+
+def tenure_labels(years, months, days):
+    """'2 Thn 3 Bulan' per person, days only during the first year, 'Today' when all parts are 0."""
+    labels = []
+    for y, m, d in zip(years.tolist(), months.tolist(), days.tolist()):
+        parts = []
+        if y > 0:
+            parts.append(f"{y} Thn")
+        if m > 0:
+            parts.append(f"{m} Bulan")
+        if d > 0 and y == 0:
+            parts.append(f"{d} Hari")
+        labels.append(" ".join(parts) if parts else "Today")
+    return labels
+
+
+class TalentTenure:
+    """
+    df_talent's Date column parsed once, with every derived view as a column of `frame`:
+
+        Staff | Start (datetime64) | Years | Months | Days | Tenure days | Since | Tenure
+
+    'Since' and 'Tenure' are the strings helper.to_human_date / count_time_since give one cell
+    at a time ('' for rows without a date); 'Tenure days' is for sorting, filtering and histograms.
+    """
+
+    def __init__(self, df_talent, today):
+        texts = df_talent["Date"].fillna("").astype(str).to_numpy(dtype=object)
+        dates = parse_dates(texts)
+        years, months, days = tenure_parts(dates, today)
+        has_date = dates.notna()
+
+        self.frame = pd.DataFrame({
+            "Staff": df_talent["Staff"].to_numpy(dtype=object),
+            "Start": dates,
+            "Years": years,
+            "Months": months,
+            "Days": days,
+            "Tenure days": np.maximum((pd.Timestamp(today).normalize() - dates).days.fillna(0), 0).astype(np.int64),
+            "Since": human_dates(dates, texts),
+            "Tenure": np.where(has_date, np.asarray(tenure_labels(years, months, days), dtype=object), ""),
+        })
+        self._staff_pos = {name: i for i, name in reversed(list(enumerate(self.frame["Staff"])))}
+
+    def of(self, staff):
+        """(since, tenure) strings of `staff` (first match), or ('', '')."""
+        i = self._staff_pos.get(staff)
+        if i is None:
+            return "", ""
+        return self.frame["Since"].iat[i], self.frame["Tenure"].iat[i]
+
+
+@cache_registry.depends_on("talent")
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_talent_tenure(talent_hash, today, _df_talent):
+    """TalentTenure per talent sheet content hash and calendar day."""
+    return TalentTenure(_df_talent, today)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import cache_registry
+
+# The one mastery scale every chart uses: 1-5, then 5.1, M(aster), W(izard)
+MASTERY_LEVELS = ['1', '2', '3', '4', '5', '5.1', 'M', 'W']
+MASTERY_SCORES = {level: float(score) for score, level in enumerate(MASTERY_LEVELS, start=1)}
+MAX_SCORE = float(len(MASTERY_LEVELS))
+
+# df_talent columns that are not skills
+INFO_COLUMNS = ("Staff", "Role", "Date")
+
+
+def mastery_score(value):
+    """Canonical score of one cell: '1'-'5' -> 1-5, '5.1' -> 6, M -> 7, W -> 8, anything else 0."""
+    return MASTERY_SCORES.get(str(value).strip().upper(), 0.0)
+
+
+class TalentMatrix:
+    """
+    df_talent converted once into a float32 staff x skill matrix of mastery scores.
+
+    - staff, skills: row / column labels
+    - scores:        (S, K) float32, 0 where a skill is empty or off the scale
+    - labels:        (S, K) original cell texts, for chart annotations
+    - level_counts:  (len(MASTERY_LEVELS), K) staff per (level, skill), for the heatmap
+
+    Scores are parsed once per distinct cell text; charts only slice `scores`.
+    """
+
+    def __init__(self, df_talent):
+        self.staff = df_talent["Staff"].to_numpy(dtype=object)
+        self.skills = [c for c in df_talent.columns if c not in INFO_COLUMNS]
+        self._staff_pos = {name: i for i, name in reversed(list(enumerate(self.staff)))}
+        self._skill_pos = {skill: j for j, skill in enumerate(self.skills)}
+
+        labels = np.array(df_talent[self.skills].to_numpy(dtype=object), dtype=object)
+        labels[pd.isna(labels)] = ""
+        codes, distinct = pd.factorize(labels.ravel())
+        distinct_scores = np.array([mastery_score(text) for text in distinct], dtype=np.float32)
+        self.scores = distinct_scores[codes].reshape(labels.shape)
+        self.labels = labels
+        self.level_counts = self._count_levels()
+        for arr in (self.scores, self.labels, self.level_counts):
+            arr.flags.writeable = False
+
+    def _count_levels(self):
+        # Scores are the level codes (0 = unrated), so one bincount over code * K + column
+        # counts every (level, skill) pair at once
+        n_levels, n_skills = len(MASTERY_LEVELS) + 1, len(self.skills)
+        codes = self.scores.astype(np.intp)
+        flat = (codes * n_skills + np.arange(n_skills)).ravel()
+        return np.bincount(flat, minlength=n_levels * n_skills).reshape(n_levels, n_skills)[1:]
+
+    def staff_index(self, staff):
+        """Row of `staff` (first match) or None."""
+        return self._staff_pos.get(staff)
+
+    def skill_index(self, skills):
+        """Column indices of the `skills` present in the matrix, in the given order."""
+        return np.array([self._skill_pos[s] for s in skills if s in self._skill_pos], dtype=np.intp)
+
+    def group_means(self, staff, groups):
+        """
+        (group names, mean score per group) for one staff member, skipping groups without any
+        known skill. `groups` maps a group name to its list of skills (see ROLES).
+        """
+        row = self.scores[self.staff_index(staff)]
+        names, means = [], []
+        for group, skills in groups.items():
+            idx = self.skill_index(skills)
+            if len(idx):
+                names.append(group)
+                means.append(float(row[idx].mean(dtype=np.float64)))
+        return names, means
+
+    def group_scores(self, staff, groups):
+        """Tidy (Category, Sub-Skill, Mastery Score, Label) frame of one staff member's rated skills."""
+        i = self.staff_index(staff)
+        pairs = [(group, skill) for group, skills in groups.items() for skill in skills if skill in self._skill_pos]
+        idx = np.array([self._skill_pos[skill] for _, skill in pairs], dtype=np.intp)
+        scores = self.scores[i, idx]
+        rated = scores > 0
+        return pd.DataFrame({
+            "Category": [group for (group, _), keep in zip(pairs, rated) if keep],
+            "Sub-Skill": [skill for (_, skill), keep in zip(pairs, rated) if keep],
+            "Mastery Score": scores[rated],
+            "Label": self.labels[i, idx][rated],
+        })
+
+
+@cache_registry.depends_on("talent")
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_talent_matrix(talent_hash, _df_talent):
+    """One immutable TalentMatrix per talent sheet content hash."""
+    return TalentMatrix(_df_talent)